@@ -0,0 +1,76 @@
+"""
+Aegis-1 Structured Output Models
+================================
+
+Pydantic models shared by the orchestrator and its agents.
+
+Reports assembled in-process (see AegisOrchestrator._build_report) are built
+with model_construct() and intentionally bypass validation: the dicts are
+produced by our own code, not by users. Anything parsed from external MCP
+tool JSON must still go through model_validate().
+
+Models are frozen so a single instance can be shared safely (e.g. from the
+report cache) and their compiled schemas reused.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class DisasterAlert(BaseModel):
+    """Structured disaster alert information"""
+    model_config = ConfigDict(frozen=True)
+    
+    disaster_type: str = Field(..., description="Type of disaster detected")
+    location: str = Field(..., description="Geographic location")
+    severity: str = Field(..., description="Severity level: low, moderate, high, critical, catastrophic")
+    population_affected: int = Field(default=0, description="Estimated affected population")
+    coordinates: Optional[List[float]] = Field(default=None, description="[latitude, longitude]")
+    source: str = Field(default="satellite", description="Alert source")
+    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
+    
+    
+class ImageAnalysisResult(BaseModel):
+    """Result from vision analysis of disaster imagery"""
+    model_config = ConfigDict(frozen=True)
+    
+    damage_level: str = Field(..., description="Overall damage assessment")
+    infrastructure_damage: int = Field(..., ge=0, le=100, description="Infrastructure damage percentage")
+    water_level_risk: Optional[str] = Field(default=None, description="Water level assessment for floods")
+    fire_spread_risk: Optional[str] = Field(default=None, description="Fire spread risk for wildfires")
+    visible_hazards: List[str] = Field(default_factory=list, description="Identified hazards")
+    rescue_priority_zones: List[str] = Field(default_factory=list, description="Areas requiring immediate rescue")
+    accessibility_assessment: str = Field(default="unknown", description="Road/access assessment")
+    confidence_score: float = Field(..., ge=0, le=1, description="Analysis confidence")
+
+
+class ZoneAssessment(BaseModel):
+    """Assessment of an affected zone"""
+    model_config = ConfigDict(frozen=True)
+    
+    name: str
+    coordinates: List[float]
+    population: int
+    infrastructure_damage: int
+    accessibility: int
+    vulnerable_population: int
+    has_medical_facility: bool
+    water_access: bool
+
+
+class CrisisActionReport(BaseModel):
+    """Complete crisis action report"""
+    model_config = ConfigDict(frozen=True)
+    
+    report_id: str
+    generated_at: str
+    disaster_summary: Dict[str, Any]
+    weather_conditions: Optional[Dict[str, Any]] = None
+    supply_requirements: Dict[str, Any]
+    zone_priorities: List[Dict[str, Any]]
+    logistics_plan: Dict[str, Any]
+    immediate_actions: Tuple[str, ...]
+    # None when the report body was streamed straight to a file
+    markdown_report: Optional[str] = None
@@ -14,26 +14,36 @@ Usage:
     python aegis_orchestrator.py --image "path/to/image.jpg" "Analyze this disaster zone"
 """
 
+from __future__ import annotations
+
 import asyncio
 import argparse
+import hashlib
+import io
 import json
 import logging
+import os
 import sys
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, ClassVar, Dict, List, Optional, Tuple
 from pathlib import Path
 
-from pydantic import BaseModel, Field
-
-# Import Dedalus Labs
-from dedalus_labs import (
-    AsyncDedalus,
-    DedalusRunner,
-    AgentConfig,
-    Message,
-    StreamEvent,
-    StreamEventType
-)
+import orjson
+
+# The agent runtime, HTTP stack and pydantic models are imported on first
+# use, so --help and --demo start without loading them
+if TYPE_CHECKING:
+    import httpx
+    from dedalus_labs import (
+        AsyncDedalus,
+        DedalusRunner,
+        AgentConfig,
+        StreamEvent
+    )
+    from aegis_v2.cost_optimizer import CostOptimizer
+    from aegis_models import CrisisActionReport
 
 # Configure logging
 logging.basicConfig(
@@ -44,63 +54,11 @@ logging.basicConfig(
 logger = logging.getLogger("aegis")
 
 
-# =============================================================================
-# Pydantic Models for Structured Outputs
-# =============================================================================
-
-class DisasterAlert(BaseModel):
-    """Structured disaster alert information"""
-    disaster_type: str = Field(..., description="Type of disaster detected")
-    location: str = Field(..., description="Geographic location")
-    severity: str = Field(..., description="Severity level: low, moderate, high, critical, catastrophic")
-    population_affected: int = Field(default=0, description="Estimated affected population")
-    coordinates: Optional[List[float]] = Field(default=None, description="[latitude, longitude]")
-    source: str = Field(default="satellite", description="Alert source")
-    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
-    
-    
-class ImageAnalysisResult(BaseModel):
-    """Result from vision analysis of disaster imagery"""
-    damage_level: str = Field(..., description="Overall damage assessment")
-    infrastructure_damage: int = Field(..., ge=0, le=100, description="Infrastructure damage percentage")
-    water_level_risk: Optional[str] = Field(default=None, description="Water level assessment for floods")
-    fire_spread_risk: Optional[str] = Field(default=None, description="Fire spread risk for wildfires")
-    visible_hazards: List[str] = Field(default_factory=list, description="Identified hazards")
-    rescue_priority_zones: List[str] = Field(default_factory=list, description="Areas requiring immediate rescue")
-    accessibility_assessment: str = Field(default="unknown", description="Road/access assessment")
-    confidence_score: float = Field(..., ge=0, le=1, description="Analysis confidence")
-
-
-class ZoneAssessment(BaseModel):
-    """Assessment of an affected zone"""
-    name: str
-    coordinates: List[float]
-    population: int
-    infrastructure_damage: int
-    accessibility: int
-    vulnerable_population: int
-    has_medical_facility: bool
-    water_access: bool
-
-
-class CrisisActionReport(BaseModel):
-    """Complete crisis action report"""
-    report_id: str
-    generated_at: str
-    disaster_summary: Dict[str, Any]
-    weather_conditions: Optional[Dict[str, Any]] = None
-    supply_requirements: Dict[str, Any]
-    zone_priorities: List[Dict[str, Any]]
-    logistics_plan: Dict[str, Any]
-    immediate_actions: List[str]
-    markdown_report: str
-
-
 # =============================================================================
 # Agent Configurations
 # =============================================================================
 
-WATCHMAN_CONFIG = AgentConfig(
+WATCHMAN_SPEC = dict(
     name="watchman",
     model="anthropic/claude-3-5-sonnet",
     system_prompt="""You are THE WATCHMAN, the triage agent for the Aegis-1 Disaster Response System.
@@ -133,7 +91,7 @@ Always maintain urgency - lives depend on rapid response.""",
 )
 
 
-VISION_SPECIALIST_CONFIG = AgentConfig(
+VISION_SPECIALIST_SPEC = dict(
     name="vision_specialist", 
     model="google/gemini-2.0-flash",
     system_prompt="""You are the VISION SPECIALIST for the Aegis-1 Disaster Response System.
@@ -165,7 +123,7 @@ Be specific and actionable - your analysis guides rescue operations.""",
 )
 
 
-CLIMATE_ANALYST_CONFIG = AgentConfig(
+CLIMATE_ANALYST_SPEC = dict(
     name="climate_analyst",
     model="anthropic/claude-3-5-sonnet",
     system_prompt="""You are the CLIMATE & LOGISTICS ANALYST for the Aegis-1 Disaster Response System.
@@ -209,6 +167,105 @@ Your analysis saves lives. Be thorough and precise.""",
 )
 
 
+@lru_cache(maxsize=None)
+def agent_configs() -> Tuple[AgentConfig, ...]:
+    """Build the frozen agent configs once, on first use"""
+    from dedalus_labs import AgentConfig
+    
+    return tuple(
+        AgentConfig(**spec)
+        for spec in (WATCHMAN_SPEC, VISION_SPECIALIST_SPEC, CLIMATE_ANALYST_SPEC)
+    )
+
+
+# =============================================================================
+# Response Cache
+# =============================================================================
+
+REPORT_CACHE_SIZE = 128
+REPORT_CACHE_TTL = timedelta(minutes=10)
+
+
+class ReportCache:
+    """
+    Two-tier LRU cache of crisis reports keyed on (alert_text, image_url).
+    
+    Tier 1 matches the exact alert text. Tier 2 matches alerts that only
+    differ in case or whitespace, so repeated pings such as "Flood in Jakarta"
+    and "flood in  jakarta" reuse the same report instead of a new swarm run.
+    """
+    
+    def __init__(self, max_size: int = REPORT_CACHE_SIZE, ttl: timedelta = REPORT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._exact: "OrderedDict[str, Tuple[datetime, CrisisActionReport]]" = OrderedDict()
+        self._normalized: "OrderedDict[str, Tuple[datetime, CrisisActionReport]]" = OrderedDict()
+    
+    @staticmethod
+    def _key(alert_text: str, image_url: Optional[str]) -> str:
+        return hashlib.blake2b((alert_text + "|" + (image_url or "")).encode()).hexdigest()
+    
+    def _tier_keys(self, alert_text: str, image_url: Optional[str]):
+        normalized = " ".join(alert_text.casefold().split())
+        return (
+            (self._exact, self._key(alert_text, image_url)),
+            (self._normalized, self._key(normalized, image_url)),
+        )
+    
+    def get(self, alert_text: str, image_url: Optional[str] = None) -> Optional[CrisisActionReport]:
+        """Return a cached report, or None on miss/expiry"""
+        now = datetime.now()
+        for tier, key in self._tier_keys(alert_text, image_url):
+            entry = tier.get(key)
+            if entry is None:
+                continue
+            stored_at, report = entry
+            if now - stored_at > self.ttl:
+                del tier[key]
+                continue
+            tier.move_to_end(key)
+            return report
+        return None
+    
+    def put(self, alert_text: str, image_url: Optional[str], report: CrisisActionReport):
+        """Store a report in both tiers, evicting least recently used entries"""
+        now = datetime.now()
+        for tier, key in self._tier_keys(alert_text, image_url):
+            tier[key] = (now, report)
+            tier.move_to_end(key)
+            while len(tier) > self.max_size:
+                tier.popitem(last=False)
+
+
+# =============================================================================
+# Stream Output
+# =============================================================================
+
+# Line formats per agent, built once: "{color}{line}{reset}\n"
+_RESET = "\033[0m"
+AGENT_LINE_FORMATS = {
+    "watchman": "\033[94m{}" + _RESET + "\n",           # Blue
+    "vision_specialist": "\033[95m{}" + _RESET + "\n",  # Magenta
+    "climate_analyst": "\033[92m{}" + _RESET + "\n",    # Green
+}
+DEFAULT_LINE_FORMAT = _RESET + "{}" + _RESET + "\n"
+ERROR_LINE_FORMAT = "\033[91m{}" + _RESET + "\n"
+
+# Buffered stream output is written after this many events or this delay
+STDOUT_FLUSH_EVENTS = 16
+STDOUT_FLUSH_INTERVAL = 0.05
+
+# Head/tail kept in memory for reports streamed to a file
+REPORT_EXCERPT_CHARS = 512
+
+# Shared by every generated report (the report models are frozen)
+DEFAULT_IMMEDIATE_ACTIONS: Tuple[str, ...] = (
+    "Review generated report",
+    "Coordinate with local authorities",
+    "Deploy initial response teams",
+)
+
+
 # =============================================================================
 # Aegis Orchestrator
 # =============================================================================
@@ -216,37 +273,100 @@ Your analysis saves lives. Be thorough and precise.""",
 class AegisOrchestrator:
     """
     Main orchestrator for the Aegis-1 multi-agent system.
+    
+    The Dedalus session and runner are shared by every orchestrator in the
+    process, so agents and MCP connections are only set up once.
     """
     
-    def __init__(self):
+    _shared_http: ClassVar[Optional[httpx.AsyncClient]] = None
+    _shared_dedalus: ClassVar[Optional[AsyncDedalus]] = None
+    _shared_runner: ClassVar[Optional[DedalusRunner]] = None
+    _shared_lock: ClassVar[asyncio.Lock] = asyncio.Lock()
+    
+    def __init__(self, cost_optimizer: Optional[CostOptimizer] = None):
+        from dedalus_labs import StreamEventType
+        from aegis_v2.cost_optimizer import CostOptimizer
+        
         self.runner: Optional[DedalusRunner] = None
         self._initialized = False
+        self.cost_optimizer = cost_optimizer or CostOptimizer()
+        self.report_cache = ReportCache()
+        
+        # Stream events are buffered and written to stdout in batches
+        self._stdout_buf = io.StringIO()
+        self._buffered_events = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        
+        # Event type -> formatter, built once instead of an if/elif chain
+        self._event_formatters: Dict[StreamEventType, Callable[[StreamEvent, str], str]] = {
+            StreamEventType.START: self._format_start,
+            StreamEventType.THINKING: self._format_thinking,
+            StreamEventType.TEXT_DELTA: self._format_text_delta,
+            StreamEventType.TOOL_CALL: self._format_tool_call,
+            StreamEventType.TOOL_RESULT: self._format_tool_result,
+            StreamEventType.HANDOFF: self._format_handoff,
+            StreamEventType.ERROR: self._format_error,
+        }
     
     async def initialize(self, mcp_servers: Optional[List[str]] = None):
         """Initialize the orchestrator with agents and MCP connections"""
-        async with AsyncDedalus() as dedalus:
-            self.runner = dedalus.create_runner()
+        import httpx
+        from dedalus_labs import AsyncDedalus
+        
+        servers = mcp_servers or [
+            "http://127.0.0.1:8000/mcp",
+            "windsornguyen/open-meteo-mcp"
+        ]
+        cls = type(self)
+        
+        async with cls._shared_lock:
+            if cls._shared_runner is not None:
+                # Known servers only re-list their tools once the cache expires
+                self.runner = cls._shared_runner
+                await self.runner.initialize(servers)
+                self._initialized = True
+                logger.info("Aegis-1 orchestrator reusing shared runner")
+                return
+            
+            # The session stays open for the life of the process
+            if cls._shared_dedalus is None:
+                # One keep-alive HTTP/2 client multiplexes every MCP request
+                cls._shared_http = httpx.AsyncClient(
+                    http2=True,
+                    limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=300)
+                )
+                cls._shared_dedalus = await AsyncDedalus(http_client=cls._shared_http).__aenter__()
+            self.runner = cls._shared_dedalus.create_runner()
             
             # Add all agents
-            self.runner.add_agent(WATCHMAN_CONFIG)
-            self.runner.add_agent(VISION_SPECIALIST_CONFIG)
-            self.runner.add_agent(CLIMATE_ANALYST_CONFIG)
+            for config in agent_configs():
+                self.runner.add_agent(config)
             
             # Initialize MCP servers
-            servers = mcp_servers or [
-                "http://127.0.0.1:8000/mcp",
-                "windsornguyen/open-meteo-mcp"
-            ]
             await self.runner.initialize(servers)
             
+            cls._shared_runner = self.runner
             self._initialized = True
             logger.info("Aegis-1 orchestrator initialized with 3 agents")
     
+    @classmethod
+    async def shutdown(cls):
+        """Close the shared Dedalus session"""
+        async with cls._shared_lock:
+            if cls._shared_dedalus is not None:
+                await cls._shared_dedalus.__aexit__(None, None, None)
+            if cls._shared_http is not None:
+                await cls._shared_http.aclose()
+            cls._shared_http = None
+            cls._shared_dedalus = None
+            cls._shared_runner = None
+    
     async def process_alert(
         self,
         alert_text: str,
         image_url: Optional[str] = None,
-        stream: bool = True
+        stream: bool = True,
+        report_path: Optional[Path] = None
     ) -> CrisisActionReport:
         """
         Process a disaster alert through the agent swarm.
@@ -255,37 +375,96 @@ class AegisOrchestrator:
             alert_text: Text description of the alert
             image_url: Optional URL to disaster imagery
             stream: Whether to stream agent reasoning
+            report_path: When streaming, write the report body here as it
+                arrives instead of keeping it on the returned report
             
         Returns:
             CrisisActionReport with full analysis
         """
+        cached = self.report_cache.get(alert_text, image_url)
+        self.cost_optimizer.record_cache_lookup(hit=cached is not None)
+        if cached is not None:
+            logger.info(f"Cache hit for alert: {alert_text[:100]}")
+            now = datetime.now()
+            return cached.model_copy(update={
+                "report_id": f"AEGIS-{now.strftime('%Y%m%d%H%M%S')}",
+                "generated_at": now.isoformat()
+            })
+        
         if not self._initialized:
             await self.initialize()
         
+        logger.info(f"Processing alert: {alert_text[:100]}...")
+        
         # Prepare input
         if image_url:
-            # Include image for multimodal processing
-            input_text = f"{alert_text}\n\n[IMAGE ATTACHED: {image_url}]"
+            # Vision and weather analysis are independent - run them
+            # concurrently and let the climate analyst synthesize the results
+            input_text = await self._run_specialists_concurrently(alert_text, image_url)
+            starting_agent = "climate_analyst"
         else:
             input_text = alert_text
+            starting_agent = "watchman"
         
-        logger.info(f"Processing alert: {alert_text[:100]}...")
-        
-        if stream:
-            return await self._process_with_stream(input_text)
+        if stream and report_path is not None:
+            with open(report_path, "w", encoding="utf-8") as report_fp:
+                report = await self._process_with_stream(input_text, starting_agent, report_fp)
+        elif stream:
+            report = await self._process_with_stream(input_text, starting_agent)
         else:
             response = await self.runner.run(
                 input_text=input_text,
-                starting_agent="watchman",
-                mcp_servers=["http://127.0.0.1:8000/mcp"],
+                starting_agent=starting_agent,
                 stream=False,
                 max_turns=10
             )
             
-            return self._build_report(response)
+            report = self._build_report(response.model_dump())
+        
+        # Streamed reports have no body to replay on a cache hit
+        if report is not None and report.markdown_report is not None:
+            self.report_cache.put(alert_text, image_url, report)
+        return report
+    
+    async def _run_specialists_concurrently(self, alert_text: str, image_url: str) -> str:
+        """
+        Run the vision specialist and the climate analyst in parallel.
+        
+        Each specialist gets a single agent run (no handoffs); their findings
+        are combined into the input for a final climate analyst synthesis turn.
+        """
+        vision_task = asyncio.create_task(self.runner.run(
+            input_text=f"{alert_text}\n\n[IMAGE ATTACHED: {image_url}]",
+            starting_agent="vision_specialist",
+            stream=False,
+            max_turns=10,
+            max_handoffs=1
+        ))
+        weather_task = asyncio.create_task(self.runner.run(
+            input_text=f"{alert_text}\n\nFetch current weather conditions and calculate supply needs for this location.",
+            starting_agent="climate_analyst",
+            stream=False,
+            max_turns=10,
+            max_handoffs=1
+        ))
+        vision, weather = await asyncio.gather(vision_task, weather_task)
+        
+        return (
+            f"{alert_text}\n\n[IMAGE ATTACHED: {image_url}]\n\n"
+            f"## Vision Specialist Findings\n{vision.content}\n\n"
+            f"## Weather & Logistics Findings\n{weather.content}\n\n"
+            "Synthesize these findings into the final Crisis Action Report."
+        )
     
-    async def _process_with_stream(self, input_text: str) -> CrisisActionReport:
-        """Process with streaming output"""
+    async def _process_with_stream(
+        self,
+        input_text: str,
+        starting_agent: str = "watchman",
+        report_fp: Optional[io.TextIOBase] = None
+    ) -> CrisisActionReport:
+        """Process with streaming output, optionally writing the report body to report_fp"""
+        from dedalus_labs import StreamEventType
+        
         final_response = None
         
         print("\n" + "=" * 60)
@@ -294,76 +473,122 @@ class AegisOrchestrator:
         
         async for event in self.runner.stream_async(
             input_text=input_text,
-            starting_agent="watchman",
-            mcp_servers=["http://127.0.0.1:8000/mcp"],
+            starting_agent=starting_agent,
             max_turns=10
         ):
             self._print_event(event)
             
+            if report_fp is not None:
+                # Only the last agent's text is the report, so each agent
+                # starts the file over
+                if event.type == StreamEventType.START:
+                    report_fp.seek(0)
+                    report_fp.truncate()
+                elif event.type == StreamEventType.TEXT_DELTA:
+                    report_fp.write(event.data)
+            
             if event.type == StreamEventType.COMPLETE:
                 final_response = event.data
         
+        self._flush_stdout()
         print("\n" + "=" * 60)
         print("✅ PROCESSING COMPLETE")
         print("=" * 60 + "\n")
         
-        return self._build_report(final_response) if final_response else None
+        if not final_response:
+            return None
+        return self._build_report(final_response, streamed=report_fp is not None)
     
     def _print_event(self, event: StreamEvent):
-        """Print a stream event with formatting"""
-        agent_colors = {
-            "watchman": "\033[94m",      # Blue
-            "vision_specialist": "\033[95m",  # Magenta
-            "climate_analyst": "\033[92m"     # Green
-        }
-        reset = "\033[0m"
-        color = agent_colors.get(event.agent, "\033[0m")
+        """Buffer a stream event with formatting"""
+        formatter = self._event_formatters.get(event.type)
+        if formatter is None:
+            return
         
-        if event.type == StreamEventType.START:
-            print(f"{color}▶ [{event.agent.upper()}] Starting...{reset}")
+        fmt = AGENT_LINE_FORMATS.get(event.agent, DEFAULT_LINE_FORMAT)
+        self._stdout_buf.write(formatter(event, fmt))
         
-        elif event.type == StreamEventType.THINKING:
-            print(f"{color}  💭 Reasoning: {event.data}{reset}")
-        
-        elif event.type == StreamEventType.TEXT_DELTA:
-            # Print content in chunks
-            content = event.data if isinstance(event.data, str) else str(event.data)
-            print(f"{color}  {content}{reset}")
-        
-        elif event.type == StreamEventType.TOOL_CALL:
-            tool_name = event.data.get("name", "unknown")
-            print(f"{color}  🔧 Calling tool: {tool_name}{reset}")
-        
-        elif event.type == StreamEventType.TOOL_RESULT:
-            print(f"{color}  ✓ Tool completed{reset}")
-        
-        elif event.type == StreamEventType.HANDOFF:
-            target = event.data.get("target", "unknown")
-            print(f"\n{color}  ➤ HANDOFF to {target.upper()}{reset}\n")
+        self._buffered_events += 1
+        if self._buffered_events >= STDOUT_FLUSH_EVENTS:
+            self._flush_stdout()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                STDOUT_FLUSH_INTERVAL, self._flush_stdout
+            )
+    
+    @staticmethod
+    def _format_start(event: StreamEvent, fmt: str) -> str:
+        return fmt.format(f"▶ [{event.agent.upper()}] Starting...")
+    
+    @staticmethod
+    def _format_thinking(event: StreamEvent, fmt: str) -> str:
+        return fmt.format(f"  💭 Reasoning: {event.data}")
+    
+    @staticmethod
+    def _format_text_delta(event: StreamEvent, fmt: str) -> str:
+        # Print content in chunks
+        content = event.data if isinstance(event.data, str) else str(event.data)
+        return fmt.format(f"  {content}")
+    
+    @staticmethod
+    def _format_tool_call(event: StreamEvent, fmt: str) -> str:
+        return fmt.format(f"  🔧 Calling tool: {event.data.get('name', 'unknown')}")
+    
+    @staticmethod
+    def _format_tool_result(event: StreamEvent, fmt: str) -> str:
+        return fmt.format("  ✓ Tool completed")
+    
+    @staticmethod
+    def _format_handoff(event: StreamEvent, fmt: str) -> str:
+        target = event.data.get("target", "unknown")
+        return "\n" + fmt.format(f"  ➤ HANDOFF to {target.upper()}") + "\n"
+    
+    @staticmethod
+    def _format_error(event: StreamEvent, fmt: str) -> str:
+        return ERROR_LINE_FORMAT.format(f"  ❌ Error: {event.data}")
+    
+    def _flush_stdout(self):
+        """Write buffered stream output to stdout"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
         
-        elif event.type == StreamEventType.ERROR:
-            print(f"\033[91m  ❌ Error: {event.data}\033[0m")
+        if self._buffered_events:
+            sys.stdout.write(self._stdout_buf.getvalue())
+            sys.stdout.flush()
+            self._stdout_buf.seek(0)
+            self._stdout_buf.truncate()
+            self._buffered_events = 0
     
-    def _build_report(self, response_data: Dict) -> CrisisActionReport:
+    @classmethod
+    def _build_report(cls, response_data: Dict, streamed: bool = False) -> CrisisActionReport:
         """Build a CrisisActionReport from response data"""
+        from aegis_models import CrisisActionReport
+        
         content = response_data.get("content", "") if response_data else ""
         
-        return CrisisActionReport(
+        if not content:
+            raw_response = "No response generated"
+        elif streamed and len(content) > 2 * REPORT_EXCERPT_CHARS:
+            # The full body is on disk; keep only its head and tail
+            raw_response = f"{content[:REPORT_EXCERPT_CHARS]}\n...\n{content[-REPORT_EXCERPT_CHARS:]}"
+        elif streamed:
+            raw_response = content
+        else:
+            raw_response = content[:500]
+        
+        return CrisisActionReport.model_construct(
             report_id=f"AEGIS-{datetime.now().strftime('%Y%m%d%H%M%S')}",
             generated_at=datetime.now().isoformat(),
             disaster_summary={
-                "raw_response": content[:500] if content else "No response generated"
+                "raw_response": raw_response
             },
             weather_conditions=None,
             supply_requirements={},
             zone_priorities=[],
             logistics_plan={},
-            immediate_actions=[
-                "Review generated report",
-                "Coordinate with local authorities",
-                "Deploy initial response teams"
-            ],
-            markdown_report=content
+            immediate_actions=DEFAULT_IMMEDIATE_ACTIONS,
+            markdown_report=None if streamed else content
         )
 
 
@@ -381,6 +606,7 @@ Examples:
   python aegis_orchestrator.py "Flood detected in Jakarta, population 500000 affected"
   python aegis_orchestrator.py --image "https://example.com/satellite.jpg" "Analyze damage"
   python aegis_orchestrator.py --no-stream "Earthquake magnitude 7.2 in Tokyo"
+  python aegis_orchestrator.py --json-output report.json "Wildfire near Sacramento"
         """
     )
     
@@ -410,16 +636,25 @@ Examples:
         help="Save report to file"
     )
     
+    parser.add_argument(
+        "--json-output",
+        type=str,
+        default=None,
+        help="Save the full report as JSON"
+    )
+    
     args = parser.parse_args()
     
     # Initialize and run
     orchestrator = AegisOrchestrator()
     
     try:
+        output_path = Path(args.output) if args.output else None
         report = await orchestrator.process_alert(
             alert_text=args.alert,
             image_url=args.image,
-            stream=not args.no_stream
+            stream=not args.no_stream,
+            report_path=output_path
         )
         
         if report:
@@ -427,13 +662,26 @@ Examples:
             print("\n" + "=" * 60)
             print("📋 CRISIS ACTION REPORT")
             print("=" * 60 + "\n")
-            print(report.markdown_report)
+            if report.markdown_report is not None:
+                print(report.markdown_report)
+                
+                # Save to file if requested
+                if output_path:
+                    output_path.write_text(report.markdown_report)
+            else:
+                # Streamed straight to the output file
+                print(report.disaster_summary["raw_response"])
             
-            # Save to file if requested
-            if args.output:
-                output_path = Path(args.output)
-                output_path.write_text(report.markdown_report)
+            if output_path:
                 print(f"\n✅ Report saved to: {output_path}")
+            
+            if args.json_output:
+                json_path = Path(args.json_output)
+                json_path.write_bytes(orjson.dumps(
+                    report.model_dump(mode="python"),
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+                ))
+                print(f"\n✅ JSON report saved to: {json_path}")
                 
     except KeyboardInterrupt:
         print("\n\n⚠️ Operation cancelled by user")
@@ -442,6 +690,12 @@ Examples:
         logger.exception("Error processing alert")
         print(f"\n❌ Error: {e}")
         sys.exit(1)
+    finally:
+        await AegisOrchestrator.shutdown()
+
+
+# Pause between simulated demo steps (seconds); no pauses under CI
+DEMO_DELAY = float(os.environ.get("AEGIS_DEMO_DELAY", "0.0" if os.environ.get("CI") else "0.5"))
 
 
 # Demo function for testing without API keys
@@ -453,21 +707,21 @@ async def demo_mode():
     
     # Simulate the agent flow
     print("\033[94m▶ [WATCHMAN] Starting triage...\033[0m")
-    await asyncio.sleep(0.5)
+    await asyncio.sleep(DEMO_DELAY)
     print("\033[94m  Analyzing alert: Flood detected in Jakarta\033[0m")
     print("\033[94m  • Disaster Type: FLOOD\033[0m")
     print("\033[94m  • Location: Jakarta, Indonesia\033[0m")
     print("\033[94m  • No imagery attached - routing to Climate Analyst\033[0m")
-    await asyncio.sleep(0.5)
+    await asyncio.sleep(DEMO_DELAY)
     print("\033[94m  ➤ HANDOFF to CLIMATE_ANALYST\033[0m\n")
     
-    await asyncio.sleep(0.3)
+    await asyncio.sleep(DEMO_DELAY * 0.6)
     print("\033[92m▶ [CLIMATE_ANALYST] Starting analysis...\033[0m")
     print("\033[92m  🔧 Calling tool: calculate_supply_needs\033[0m")
-    await asyncio.sleep(0.5)
+    await asyncio.sleep(DEMO_DELAY)
     print("\033[92m  ✓ Tool completed\033[0m")
     print("\033[92m  🔧 Calling tool: generate_crisis_report\033[0m")
-    await asyncio.sleep(0.5)
+    await asyncio.sleep(DEMO_DELAY)
     print("\033[92m  ✓ Tool completed\033[0m")
     
     # Print demo report
@@ -534,6 +788,13 @@ async def demo_mode():
 
 
 if __name__ == "__main__":
+    # uvloop gives a faster event loop where available (Linux/macOS)
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     # Check if we should run demo mode
     if len(sys.argv) > 1 and sys.argv[1] == "--demo":
         asyncio.run(demo_mode())
@@ -38,8 +38,8 @@ Features that make this win "Best MCP Tooling":
 """
 
 from .model_router import ModelRouter, ModelCapability
-from .mcp_mesh import MCPMesh, MCPServerNode
-from .swarm import AegisSwarm, SwarmConfig
+from .mcp_mesh import MCPMesh, MCPServerNode, MeshToolResult
+from .swarm import AegisSwarm, SwarmConfig, classify_alert_tier
 from .cost_optimizer import CostOptimizer, Budget
 
 __version__ = "2.0.0"
@@ -6,9 +6,12 @@ Real-time cost optimization across models and tools.
 """
 
 import asyncio
+import time
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from enum import Enum
 import logging
 
@@ -45,7 +48,7 @@ class CostRecord:
     input_tokens: int
     output_tokens: int
     cost_usd: float
-    metadata: Dict = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
 
 class CostOptimizer:
@@ -59,23 +62,201 @@ class CostOptimizer:
     - Alerting
     """
     
-    def __init__(self, budget: Optional[Budget] = None):
+    def __init__(self, budget: Optional[Budget] = None, max_records: int = 100_000) -> None:
+        # max_records bounds the stored rows: past it, expired rows are dropped
+        # and the oldest of today's rows are folded into per-model aggregates
         self.budget = budget or Budget()
-        self.records: List[CostRecord] = []
-        self._daily_reset = datetime.now().replace(hour=0, minute=0, second=0)
-        self._hourly_reset = datetime.now().replace(minute=0, second=0)
+        self.max_records = max_records
+        
+        # Day/hour boundaries in epoch microseconds, recomputed only when
+        # the clock crosses into a new hour
+        self._day_start_us = 0
+        self._hour_start_us = 0
+        self._next_hour_us = 0
+        # Latest timestamp handed out; the clock never goes back past it
+        self._last_us = 0
+        self._now_us()
+        
+        # Record store as parallel arrays (struct-of-arrays): the numeric
+        # columns are packed C doubles/ints, so window sums never touch
+        # per-record Python objects. Model names are interned to small ids.
+        self._ts_us = array("q")          # epoch microseconds
+        self._costs = array("d")
+        self._input_tokens = array("q")
+        self._output_tokens = array("q")
+        self._model_ids = array("H")
+        self._counts = array("I")         # cost events per row (>1 for folded rows)
+        self._operations: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._model_index: Dict[str, int] = {}
+        self._model_names: List[str] = []
+        
+        # Running totals over the records still inside the current day/hour.
+        # The windows are [start, len) slices of the arrays; the start
+        # cursors only move forward as records age out.
+        self._day_start = 0
+        self._hour_start = 0
+        self._spent_today = 0.0
+        self._spent_hour = 0.0
+        self._model_spend_today: List[float] = []
+        self._model_records_today: List[int] = []
+        
+        # Response cache metrics (hits avoid a full billed swarm run)
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    @property
+    def records(self) -> List[CostRecord]:
+        """All recorded cost events, materialized as CostRecord objects"""
+        return [
+            CostRecord(
+                timestamp=datetime.fromtimestamp(self._ts_us[i] / 1e6),
+                model=self._model_names[self._model_ids[i]],
+                operation=self._operations[i],
+                input_tokens=self._input_tokens[i],
+                output_tokens=self._output_tokens[i],
+                cost_usd=self._costs[i],
+                metadata=self._metadata[i]
+            )
+            for i in range(len(self._costs))
+        ]
+    
+    def _model_id(self, model: str) -> int:
+        """Intern a model name to a small integer id"""
+        model_id = self._model_index.get(model)
+        if model_id is None:
+            model_id = len(self._model_names)
+            self._model_index[model] = model_id
+            self._model_names.append(model)
+            self._model_spend_today.append(0.0)
+            self._model_records_today.append(0)
+        return model_id
+    
+    def _now_us(self) -> int:
+        """Current time in epoch microseconds, rolling the window boundaries if needed"""
+        now_us = time.time_ns() // 1000
+        # The window cursors bisect the timestamp column, so it must stay sorted
+        # even if the wall clock is stepped backwards (e.g. by NTP)
+        if now_us < self._last_us:
+            now_us = self._last_us
+        self._last_us = now_us
+        if now_us >= self._next_hour_us:
+            now = datetime.fromtimestamp(now_us / 1e6)
+            hour_start = now.replace(minute=0, second=0, microsecond=0)
+            day_start = hour_start.replace(hour=0)
+            self._hour_start_us = int(hour_start.timestamp() * 1e6)
+            self._next_hour_us = int((hour_start + timedelta(hours=1)).timestamp() * 1e6)
+            self._day_start_us = int(day_start.timestamp() * 1e6)
+        return now_us
+    
+    def _expire_windows(self) -> None:
+        """Drop records that fell out of the current day/hour from the totals"""
+        self._now_us()
+        day_cutoff, hour_cutoff = self._day_start_us, self._hour_start_us
+        ts, costs, n = self._ts_us, self._costs, len(self._costs)
+        
+        # Records are appended in time order, so each window start is a
+        # binary search from the previous cursor
+        start = self._day_start
+        end = bisect_left(ts, day_cutoff, start, n)
+        if end > start:
+            expired = costs[start:end]
+            self._spent_today -= sum(expired)
+            for model_id, cost, count in zip(self._model_ids[start:end], expired, self._counts[start:end]):
+                self._model_spend_today[model_id] -= cost
+                self._model_records_today[model_id] -= count
+            self._day_start = end
+        
+        start = self._hour_start
+        end = bisect_left(ts, hour_cutoff, start, n)
+        if end > start:
+            self._spent_hour -= sum(costs[start:end])
+            self._hour_start = end
+        
+        # Avoid carrying float drift once a window empties out
+        if self._day_start == n:
+            self._spent_today = 0.0
+        if self._hour_start == n:
+            self._spent_hour = 0.0
+    
+    def _compact(self) -> None:
+        """Keep the buffer within max_records rows once it grows past them"""
+        if len(self._costs) <= self.max_records:
+            return
+        
+        # Expired rows no longer count toward any window
+        drop = self._day_start
+        if drop:
+            del self._ts_us[:drop]
+            del self._costs[:drop]
+            del self._input_tokens[:drop]
+            del self._output_tokens[:drop]
+            del self._model_ids[:drop]
+            del self._counts[:drop]
+            del self._operations[:drop]
+            del self._metadata[:drop]
+            self._day_start = 0
+            self._hour_start -= drop
+        
+        # Still too many rows from today: shrink to half the cap, so the O(n)
+        # rebuild is amortized across at least max_records / 2 appends
+        fold = len(self._costs) - self.max_records // 2
+        if fold > 0:
+            self._fold_front(fold)
+    
+    def _fold_front(self, k: int) -> None:
+        """Merge today's oldest k rows into one row per (model, hour window)"""
+        ts, model_ids, counts = self._ts_us, self._model_ids, self._counts
+        costs, input_tokens, output_tokens = self._costs, self._input_tokens, self._output_tokens
+        hour_start = self._hour_start
+        
+        # Rows before the hour cursor only count toward today; the rest also
+        # toward this hour. Grouping on that keeps every window total exact.
+        groups: Dict[Any, List[Any]] = {}
+        for i in range(k):
+            key = (i >= hour_start, model_ids[i])
+            group = groups.get(key)
+            if group is None:
+                groups[key] = [ts[i], costs[i], input_tokens[i], output_tokens[i], counts[i], model_ids[i]]
+            else:
+                group[0] = ts[i]  # Latest in the group; rows are in time order
+                group[1] += costs[i]
+                group[2] += input_tokens[i]
+                group[3] += output_tokens[i]
+                group[4] += counts[i]
+        
+        # Each merged row takes its latest timestamp, so the column stays sorted
+        merged = sorted(groups.items(), key=lambda item: item[1][0])
+        rows = [group for _, group in merged]
+        ts[:k] = array("q", [row[0] for row in rows])
+        costs[:k] = array("d", [row[1] for row in rows])
+        input_tokens[:k] = array("q", [row[2] for row in rows])
+        output_tokens[:k] = array("q", [row[3] for row in rows])
+        counts[:k] = array("I", [row[4] for row in rows])
+        model_ids[:k] = array("H", [row[5] for row in rows])
+        self._operations[:k] = ["aggregate"] * len(rows)
+        self._metadata[:k] = [{"records": row[4]} for row in rows]
+        
+        before_hour = sum(1 for (in_hour, _), _group in merged if not in_hour)
+        self._hour_start = before_hour + max(0, hour_start - k)
     
     @property
     def spent_today(self) -> float:
         """Total spent today"""
-        cutoff = datetime.now().replace(hour=0, minute=0, second=0)
-        return sum(r.cost_usd for r in self.records if r.timestamp >= cutoff)
+        self._expire_windows()
+        return self._spent_today
     
     @property
     def spent_this_hour(self) -> float:
         """Total spent this hour"""
-        cutoff = datetime.now().replace(minute=0, second=0)
-        return sum(r.cost_usd for r in self.records if r.timestamp >= cutoff)
+        self._expire_windows()
+        return self._spent_hour
+    
+    @property
+    def records_today(self) -> int:
+        """Number of cost events recorded today"""
+        self._expire_windows()
+        return sum(self._model_records_today)
     
     @property
     def daily_utilization(self) -> float:
@@ -99,19 +280,26 @@ class CostOptimizer:
         input_tokens: int,
         output_tokens: int,
         cost_usd: float,
-        **metadata
-    ):
+        **metadata: Any
+    ) -> None:
         """Record a cost event"""
-        record = CostRecord(
-            timestamp=datetime.now(),
-            model=model,
-            operation=operation,
-            input_tokens=input_tokens,
-            output_tokens=output_tokens,
-            cost_usd=cost_usd,
-            metadata=metadata
-        )
-        self.records.append(record)
+        self._expire_windows()
+        
+        model_id = self._model_id(model)
+        self._ts_us.append(self._now_us())
+        self._costs.append(cost_usd)
+        self._input_tokens.append(input_tokens)
+        self._output_tokens.append(output_tokens)
+        self._model_ids.append(model_id)
+        self._counts.append(1)
+        self._operations.append(operation)
+        self._metadata.append(metadata)
+        
+        self._spent_today += cost_usd
+        self._spent_hour += cost_usd
+        self._model_spend_today[model_id] += cost_usd
+        self._model_records_today[model_id] += 1
+        self._compact()
         
         # Check alerts
         if self.daily_utilization >= self.budget.critical_at_percent:
@@ -119,6 +307,21 @@ class CostOptimizer:
         elif self.daily_utilization >= self.budget.warn_at_percent:
             logger.warning(f"⚠️ Budget warning: {self.daily_utilization:.1f}% used")
     
+    def record_cache_lookup(self, hit: bool) -> None:
+        """Record a response cache hit or miss"""
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+    
+    @property
+    def cache_hit_rate(self) -> float:
+        """Percentage of cache lookups that were hits"""
+        lookups = self.cache_hits + self.cache_misses
+        if not lookups:
+            return 0.0
+        return (self.cache_hits / lookups) * 100
+    
     def can_afford(self, estimated_cost: float) -> bool:
         """Check if we can afford an operation"""
         if self.budget.policy == BudgetPolicy.UNLIMITED:
@@ -161,8 +364,7 @@ class CostOptimizer:
     
     def forecast_daily_spend(self) -> float:
         """Forecast total daily spend based on current rate"""
-        now = datetime.now()
-        hours_elapsed = now.hour + now.minute / 60
+        hours_elapsed = (self._now_us() - self._day_start_us) / 3.6e9
         
         if hours_elapsed < 1:
             return self.spent_today
@@ -170,8 +372,9 @@ class CostOptimizer:
         hourly_rate = self.spent_today / hours_elapsed
         return hourly_rate * 24
     
-    def get_summary(self) -> Dict:
+    def get_summary(self) -> Dict[str, Any]:
         """Get cost summary"""
+        self._expire_windows()
         return {
             "budget": {
                 "daily_limit": self.budget.daily_limit_usd,
@@ -184,18 +387,21 @@ class CostOptimizer:
                 "daily_utilization_pct": round(self.daily_utilization, 1),
                 "forecasted_daily": round(self.forecast_daily_spend(), 4),
             },
+            "cache": {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_rate_pct": round(self.cache_hit_rate, 1),
+            },
             "status": self.budget_status,
-            "records_today": len([r for r in self.records if r.timestamp >= self._daily_reset]),
+            "records_today": self.records_today,
         }
     
     def get_model_breakdown(self) -> Dict[str, float]:
         """Get cost breakdown by model"""
-        cutoff = datetime.now().replace(hour=0, minute=0, second=0)
-        breakdown = {}
-        
-        for record in self.records:
-            if record.timestamp >= cutoff:
-                breakdown[record.model] = breakdown.get(record.model, 0) + record.cost_usd
-        
-        return breakdown
+        self._expire_windows()
+        return {
+            name: self._model_spend_today[model_id]
+            for model_id, name in enumerate(self._model_names)
+            if self._model_records_today[model_id]
+        }
 
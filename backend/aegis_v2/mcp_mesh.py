@@ -10,15 +10,58 @@ This is where the MCP magic happens:
 """
 
 import asyncio
+import contextlib
 import logging
-from typing import Any, Dict, List, Optional, Set
-from dataclasses import dataclass, field
-from datetime import datetime
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from functools import partial
+from itertools import count
 import httpx
+import orjson
+
+from dedalus_labs.streaming import kvitems
 
 logger = logging.getLogger(__name__)
 
+# Fixed part of every tools/call request, merged with the id and params
+_RPC_CALL_TEMPLATE = {"jsonrpc": "2.0", "method": "tools/call"}
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# Circuit breaker: open after this many consecutive transport failures, for
+# CIRCUIT_BASE_COOLDOWN_S doubling with each further failure (i.e. each failed
+# half-open probe), capped at CIRCUIT_MAX_COOLDOWN_S
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_BASE_COOLDOWN_S = 1.0
+CIRCUIT_MAX_COOLDOWN_S = 30.0
+
+# Results of read-only tools kept for reuse (LRU beyond this many entries)
+RESULT_CACHE_SIZE = 512
+
+# One shared {"type": ...} property schema per JSON type, reused by every tool
+_PROPERTY_SCHEMAS: Dict[str, Dict[str, str]] = {}
+
+
+def _property_schema(json_type: str) -> Dict[str, str]:
+    """Shared property schema for a JSON type"""
+    schema = _PROPERTY_SCHEMAS.get(json_type)
+    if schema is None:
+        schema = _PROPERTY_SCHEMAS[json_type] = {"type": json_type}
+    return schema
+
+
+def _canonical(value: Any) -> Any:
+    """Hashable, order-independent form of tool arguments"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _canonical(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_canonical(v) for v in value)
+    return value
+
 
 class MCPServerType(Enum):
     """Types of MCP servers in the mesh"""
@@ -31,7 +74,7 @@ class MCPServerType(Enum):
     COMMS = "communications"         # Alert/notification systems
 
 
-@dataclass
+@dataclass(slots=True)
 class MCPTool:
     """A tool exposed by an MCP server"""
     name: str
@@ -41,9 +84,21 @@ class MCPTool:
     estimated_latency_ms: int = 500
     requires_auth: bool = False
     cost_per_call: float = 0.0
+    cacheable_ttl_s: Optional[float] = None  # Set for read-only tools
+    large_response: bool = False  # Parse the response incrementally
+    
+    # JSON schema for LLM function calling, derived once from parameters
+    _llm_schema: Dict[str, Any] = field(default=None, init=False, repr=False)
+    
+    def __post_init__(self):
+        self._llm_schema = {
+            "type": "object",
+            "properties": {k: _property_schema(v) for k, v in self.parameters.items()},
+            "required": list(self.parameters.keys())
+        }
 
 
-@dataclass 
+@dataclass(slots=True)
 class MCPServerNode:
     """A node in the MCP server mesh"""
     id: str
@@ -52,13 +107,41 @@ class MCPServerNode:
     server_type: MCPServerType
     tools: Dict[str, MCPTool] = field(default_factory=dict)
     is_healthy: bool = True
-    last_ping: Optional[datetime] = None
+    last_ping: Optional[float] = None  # Epoch seconds
     latency_ms: int = 0
     error_count: int = 0
     
+    # Concurrent tools/call requests allowed against this server
+    max_inflight: int = 8
+    
+    # Circuit breaker state (time.monotonic() deadline; 0 = closed)
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    
+    # Cached get_mesh_status entry and the (healthy, latency, errors) it reflects
+    _status: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    _status_key: Optional[Tuple[bool, int, int]] = field(default=None, init=False, repr=False, compare=False)
+    
     # Authentication
     requires_auth: bool = False
     auth_type: Optional[str] = None  # "api_key", "oauth", "dauth"
+    
+    # Tools served by a co-located MCPServer, called without HTTP
+    in_process_handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = field(default_factory=dict)
+    
+    # Whether the server runs on this host, derived from the URL once
+    is_local: bool = field(default=False, init=False)
+    
+    def __post_init__(self):
+        self.is_local = "127.0.0.1" in self.url or "localhost" in self.url
+
+
+@dataclass(slots=True)
+class MeshToolResult:
+    """Outcome of one call in a parallel batch"""
+    ok: bool
+    value: Any = None
+    error: Optional[str] = None
 
 
 # Pre-configured MCP servers for disaster relief
@@ -68,6 +151,7 @@ DISASTER_RELIEF_MESH: Dict[str, MCPServerNode] = {
         name="Relief Operations",
         url="http://127.0.0.1:8000/mcp",
         server_type=MCPServerType.RELIEF_OPS,
+        max_inflight=32,  # Local server
         tools={
             "calculate_supply_needs": MCPTool(
                 name="calculate_supply_needs",
@@ -112,6 +196,7 @@ DISASTER_RELIEF_MESH: Dict[str, MCPServerNode] = {
                 server_id="open-meteo",
                 parameters={"latitude": "number", "longitude": "number"},
                 estimated_latency_ms=150,
+                cacheable_ttl_s=60,
             ),
             "get_forecast": MCPTool(
                 name="get_forecast",
@@ -119,6 +204,7 @@ DISASTER_RELIEF_MESH: Dict[str, MCPServerNode] = {
                 server_id="open-meteo",
                 parameters={"latitude": "number", "longitude": "number", "days": "integer"},
                 estimated_latency_ms=200,
+                cacheable_ttl_s=600,
             ),
             "get_flood_risk": MCPTool(
                 name="get_flood_risk",
@@ -126,6 +212,7 @@ DISASTER_RELIEF_MESH: Dict[str, MCPServerNode] = {
                 server_id="open-meteo",
                 parameters={"latitude": "number", "longitude": "number"},
                 estimated_latency_ms=300,
+                cacheable_ttl_s=300,
             ),
         }
     ),
@@ -145,6 +232,8 @@ DISASTER_RELIEF_MESH: Dict[str, MCPServerNode] = {
                 parameters={"region": "string", "days": "integer"},
                 estimated_latency_ms=800,
                 requires_auth=True,
+                cacheable_ttl_s=300,
+                large_response=True,
             ),
             "get_fire_history": MCPTool(
                 name="get_fire_history",
@@ -153,6 +242,8 @@ DISASTER_RELIEF_MESH: Dict[str, MCPServerNode] = {
                 parameters={"region": "string", "start_date": "string", "end_date": "string"},
                 estimated_latency_ms=1200,
                 requires_auth=True,
+                cacheable_ttl_s=3600,
+                large_response=True,
             ),
             "get_burn_area": MCPTool(
                 name="get_burn_area",
@@ -170,6 +261,7 @@ DISASTER_RELIEF_MESH: Dict[str, MCPServerNode] = {
         name="Google Maps Platform",
         url="https://maps.googleapis.com/mcp",  # Hypothetical
         server_type=MCPServerType.MAPS,
+        max_inflight=4,  # Paid API
         requires_auth=True,
         auth_type="api_key",
         tools={
@@ -181,6 +273,7 @@ DISASTER_RELIEF_MESH: Dict[str, MCPServerNode] = {
                 estimated_latency_ms=100,
                 requires_auth=True,
                 cost_per_call=0.005,
+                cacheable_ttl_s=86400,
             ),
             "calculate_route": MCPTool(
                 name="calculate_route",
@@ -208,6 +301,7 @@ DISASTER_RELIEF_MESH: Dict[str, MCPServerNode] = {
         name="Featherless Vision API",
         url="https://api.featherless.ai/mcp",  # Hypothetical
         server_type=MCPServerType.VISION,
+        max_inflight=4,  # Paid API
         requires_auth=True,
         auth_type="api_key",
         tools={
@@ -257,44 +351,161 @@ class MCPMesh:
     
     def __init__(self):
         self.servers: Dict[str, MCPServerNode] = {}
-        self.tool_index: Dict[str, MCPTool] = {}  # tool_name -> tool
+        self.tool_index: Dict[str, MCPTool] = {}  # "server_id/tool_name" -> tool
+        self._short_index: Dict[str, List[str]] = defaultdict(list)  # tool_name -> full names
         self._health_check_interval = 30  # seconds
-        self._client = httpx.AsyncClient(timeout=30.0)
+        # HTTP/2 multiplexes concurrent calls to a server over one connection
+        self._client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=64,
+                max_connections=256,
+                keepalive_expiry=60.0
+            ),
+            timeout=httpx.Timeout(30.0, connect=2.0)
+        )
+        self._req_ids = count()  # JSON-RPC request ids
+        
+        self._health_task: Optional[asyncio.Task] = None
+        
+        # LLM tool list, rebuilt only after the mesh changes
+        self._llm_tools_cache: Optional[List[Dict[str, Any]]] = None
+        
+        # Tools grouped by server type (all / healthy servers only), rebuilt lazily
+        self._tools_by_type: Optional[Dict[MCPServerType, List[MCPTool]]] = None
+        self._healthy_by_type: Optional[Dict[MCPServerType, List[MCPTool]]] = None
+        self._healthy_count = 0
+        
+        # Bumped whenever the set of registered or healthy tools changes, so
+        # callers can tell when tool lists derived from the mesh are stale
+        self.topology_version = 0
+        
+        # Capability (tool name) -> cheapest namespaced tool, see plan_chain
+        self._route_cache: Dict[str, str] = {}
+        self._server_sems: Dict[str, asyncio.Semaphore] = {}
+        
+        # "server__tool" -> (server_id, tool_name), filled once per known tool
+        self._parsed_tool_names: Dict[str, Tuple[str, str]] = {}
+        
+        # (server_id, tool, canonical args) -> (fetched_at, result)
+        self._result_cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: Dict[Tuple, asyncio.Task] = {}
+    
+    async def start(self):
+        """Start background health monitoring"""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def aclose(self):
+        """Stop health monitoring and close pooled connections"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        await self._client.aclose()
     
     async def register_server(self, server: MCPServerNode) -> bool:
         """Register an MCP server with the mesh"""
+        previous = self.servers.get(server.id)
+        if previous is not None and previous.is_healthy:
+            self._healthy_count -= 1
+        if server.is_healthy:
+            self._healthy_count += 1
         self.servers[server.id] = server
         
         # Index all tools
         for tool_name, tool in server.tools.items():
             full_name = f"{server.id}/{tool_name}"
             self.tool_index[full_name] = tool
-            self.tool_index[tool_name] = tool  # Also index by short name
+            if full_name not in self._short_index[tool_name]:
+                self._short_index[tool_name].append(full_name)
+        
+        self._llm_tools_cache = None
+        self._tools_by_type = None
+        self._healthy_by_type = None
+        self._route_cache.clear()
+        self.topology_version += 1
         
         # Verify connectivity
         is_healthy = await self._health_check(server)
-        server.is_healthy = is_healthy
+        self._set_health(server, is_healthy)
         
         logger.info(f"Registered MCP server: {server.name} ({len(server.tools)} tools) - {'✓' if is_healthy else '✗'}")
         return is_healthy
     
+    def attach_in_process(self, server_id: str, mcp_server: Any):
+        """Route a registered server's tools straight to a co-located MCPServer"""
+        node = self.servers.get(server_id)
+        if not node:
+            raise ValueError(f"Unknown server: {server_id}")
+        
+        for tool_name in node.tools:
+            if tool_name in mcp_server.tools:
+                node.in_process_handlers[tool_name] = partial(mcp_server.call_tool, tool_name)
+        self._set_health(node, True)
+        logger.info(f"Serving {len(node.in_process_handlers)} {node.name} tools in-process")
+    
     async def register_default_mesh(self):
-        """Register all default disaster relief MCP servers"""
-        for server_id, server in DISASTER_RELIEF_MESH.items():
-            await self.register_server(server)
+        """Register all default disaster relief MCP servers concurrently"""
+        # Each mesh gets its own nodes: health, breaker state and in-process
+        # handlers are per mesh, while the immutable MCPTools are shared
+        servers = [
+            replace(node, tools=dict(node.tools), in_process_handlers={})
+            for node in DISASTER_RELIEF_MESH.values()
+        ]
+        results = await asyncio.gather(
+            *(self.register_server(server) for server in servers),
+            return_exceptions=True
+        )
+        
+        healthy = sum(1 for r in results if r is True)
+        for server, result in zip(servers, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to register MCP server {server.name}: {result}")
+        logger.info(f"Default mesh registered: {healthy}/{len(results)} servers healthy")
+    
+    async def _health_loop(self):
+        """Re-probe every server in the background; calls use the last known state"""
+        while True:
+            await asyncio.sleep(self._health_check_interval)
+            servers = list(self.servers.values())
+            results = await asyncio.gather(*(self._health_check(s) for s in servers))
+            for server, is_healthy in zip(servers, results):
+                self._set_health(server, is_healthy)
+            # Latencies were re-measured, so routes may have changed
+            self._route_cache.clear()
+    
+    def _set_health(self, server: MCPServerNode, is_healthy: bool):
+        """Update a server's health, invalidating derived state on a change"""
+        if server.is_healthy != is_healthy:
+            server.is_healthy = is_healthy
+            self._healthy_count += 1 if is_healthy else -1
+            self._llm_tools_cache = None
+            self._healthy_by_type = None
+            self._route_cache.clear()
+            self.topology_version += 1
     
     async def _health_check(self, server: MCPServerNode) -> bool:
         """Check if an MCP server is healthy"""
+        if server.in_process_handlers:
+            server.last_ping = time.time()
+            server.latency_ms = 0
+            return True
+        
         try:
             # For local server, actually check
-            if "127.0.0.1" in server.url or "localhost" in server.url:
+            if server.is_local:
+                started = time.perf_counter_ns()
                 response = await self._client.get(server.url.replace("/mcp", ""), timeout=5.0)
-                server.last_ping = datetime.now()
-                server.latency_ms = int(response.elapsed.total_seconds() * 1000)
+                server.latency_ms = (time.perf_counter_ns() - started) // 1_000_000
+                server.last_ping = time.time()
                 return response.status_code == 200
             
             # For external servers, assume healthy (mock)
-            server.last_ping = datetime.now()
+            server.last_ping = time.time()
             server.latency_ms = 100
             return True
             
@@ -309,20 +520,35 @@ class MCPMesh:
         require_available: bool = True
     ) -> List[MCPTool]:
         """Discover tools across the mesh"""
-        tools = []
+        index = self._type_index(healthy_only=require_available)
         
+        if capability_filter:
+            return list(index.get(capability_filter, ()))
+        return [tool for tools in index.values() for tool in tools]
+    
+    def _type_index(self, healthy_only: bool) -> Dict[MCPServerType, List[MCPTool]]:
+        """Tools grouped by server type, rebuilt only after the mesh changes"""
+        index = self._healthy_by_type if healthy_only else self._tools_by_type
+        if index is not None:
+            return index
+        
+        index = {}
         for server in self.servers.values():
-            if require_available and not server.is_healthy:
-                continue
-            if capability_filter and server.server_type != capability_filter:
+            if healthy_only and not server.is_healthy:
                 continue
-            
-            tools.extend(server.tools.values())
+            index.setdefault(server.server_type, []).extend(server.tools.values())
         
-        return tools
+        if healthy_only:
+            self._healthy_by_type = index
+        else:
+            self._tools_by_type = index
+        return index
     
     def get_tools_for_llm(self) -> List[Dict[str, Any]]:
         """Get all available tools in LLM-compatible format"""
+        if self._llm_tools_cache is not None:
+            return list(self._llm_tools_cache)
+        
         tools = []
         
         for server in self.servers.values():
@@ -335,17 +561,12 @@ class MCPMesh:
                     "function": {
                         "name": f"{server.id}__{tool_name}",  # Namespaced
                         "description": f"[{server.name}] {tool.description}",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                k: {"type": v} for k, v in tool.parameters.items()
-                            },
-                            "required": list(tool.parameters.keys())
-                        }
+                        "parameters": tool._llm_schema
                     }
                 })
         
-        return tools
+        self._llm_tools_cache = tools
+        return list(tools)
     
     async def call_tool(
         self, 
@@ -355,65 +576,229 @@ class MCPMesh:
     ) -> Any:
         """Call a tool on its MCP server"""
         # Parse namespaced tool name
-        if "__" in tool_name:
-            server_id, actual_tool_name = tool_name.split("__", 1)
-        else:
-            # Find server by tool name
-            tool = self.tool_index.get(tool_name)
-            if not tool:
-                raise ValueError(f"Unknown tool: {tool_name}")
-            server_id = tool.server_id
-            actual_tool_name = tool_name
+        if "__" not in tool_name:
+            # Several servers may expose the same short name; take the fastest healthy one
+            tool_name = self._best_route(tool_name)
+        server_id, actual_tool_name = (
+            self._parsed_tool_names.get(tool_name) or self._parse_tool_name(tool_name)
+        )
         
         server = self.servers.get(server_id)
         if not server:
             raise ValueError(f"Unknown server: {server_id}")
         
+        tool = server.tools.get(actual_tool_name)
+        ttl = tool.cacheable_ttl_s if tool else None
+        if ttl is None:
+            return await self._invoke(server, actual_tool_name, arguments, timeout_ms)
+        
+        key = (server_id, actual_tool_name, _canonical(arguments))
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            age = time.monotonic() - cached[0]
+            if age < ttl:
+                self._result_cache.move_to_end(key)
+                return cached[1]
+            if age < 2 * ttl:
+                # Stale but recent: serve it and revalidate in the background
+                if key not in self._refreshing:
+                    self._refreshing[key] = asyncio.create_task(
+                        self._refresh_cached(key, server, actual_tool_name, arguments)
+                    )
+                return cached[1]
+        
+        result = await self._invoke(server, actual_tool_name, arguments, timeout_ms)
+        self._store_result(key, result)
+        return result
+    
+    def _parse_tool_name(self, tool_name: str) -> Tuple[str, str]:
+        """Split a namespaced tool name, caching it if it names a registered server"""
+        server_id, actual_tool_name = parsed = tuple(tool_name.split("__", 1))
+        if server_id in self.servers:
+            self._parsed_tool_names[tool_name] = parsed
+        return parsed
+    
+    def _store_result(self, key: Tuple, result: Any):
+        """Cache a tool result, evicting the least recently used entry if full"""
+        self._result_cache[key] = (time.monotonic(), result)
+        self._result_cache.move_to_end(key)
+        if len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+    
+    async def _refresh_cached(
+        self,
+        key: Tuple,
+        server: MCPServerNode,
+        tool_name: str,
+        arguments: Dict[str, Any]
+    ):
+        """Re-fetch a stale cached result"""
+        try:
+            self._store_result(key, await self._invoke(server, tool_name, arguments))
+        except Exception as e:
+            logger.debug(f"Background refresh of {tool_name} failed: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+    
+    async def _invoke(
+        self,
+        server: MCPServerNode,
+        actual_tool_name: str,
+        arguments: Dict[str, Any],
+        timeout_ms: Optional[int] = None
+    ) -> Any:
+        """Send a tools/call request to a server"""
+        handler = server.in_process_handlers.get(actual_tool_name)
+        if handler is not None:
+            return await handler(arguments)
+        
         if not server.is_healthy:
             raise ConnectionError(f"Server {server.name} is not healthy")
         
+        if server.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            now = time.monotonic()
+            if now < server.open_until:
+                raise ConnectionError(f"Circuit open for {server.name}")
+            # Half-open: let this call probe, and hold the others off meanwhile
+            server.open_until = now + CIRCUIT_MAX_COOLDOWN_S
+        
+        # Bound in-flight requests per server so one busy server cannot flood the pool
+        sem = self._server_sems.get(server.id)
+        if sem is None:
+            sem = self._server_sems[server.id] = asyncio.Semaphore(server.max_inflight)
+        
         # Make MCP call
-        try:
-            response = await self._client.post(
-                server.url,
-                json={
-                    "jsonrpc": "2.0",
-                    "id": f"mesh-{datetime.now().timestamp()}",
-                    "method": "tools/call",
+        async with sem:
+            try:
+                body = _RPC_CALL_TEMPLATE | {
+                    "id": f"mesh-{next(self._req_ids)}",
                     "params": {
                         "name": actual_tool_name,
                         "arguments": arguments
                     }
-                },
-                timeout=timeout_ms / 1000 if timeout_ms else 30.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "result" in data:
-                    return data["result"]
-                elif "error" in data:
-                    raise Exception(data["error"].get("message", "Unknown MCP error"))
+                }
+                
+                tool = server.tools.get(actual_tool_name)
+                if tool is not None and tool.large_response:
+                    return await self._invoke_streamed(server, body, timeout_ms)
+                
+                response = await self._client.post(
+                    server.url,
+                    content=orjson.dumps(body),
+                    headers=_JSON_HEADERS,
+                    timeout=timeout_ms / 1000 if timeout_ms else 30.0
+                )
+                server.consecutive_failures = 0
+                server.open_until = 0.0
+                
+                if response.status_code == 200:
+                    data = orjson.loads(response.content)
+                    if "result" in data:
+                        return data["result"]
+                    elif "error" in data:
+                        raise Exception(data["error"].get("message", "Unknown MCP error"))
+                
+                raise Exception(f"MCP call failed: {response.status_code}")
+                
+            except httpx.RequestError as e:
+                server.error_count += 1
+                server.consecutive_failures += 1
+                if server.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+                    # Exponent clamped so a long-dead server can't overflow the float
+                    trips = min(server.consecutive_failures - CIRCUIT_FAILURE_THRESHOLD, 16)
+                    cooldown = min(CIRCUIT_MAX_COOLDOWN_S, CIRCUIT_BASE_COOLDOWN_S * 2 ** trips)
+                    server.open_until = time.monotonic() + cooldown
+                    logger.warning(f"Circuit opened for {server.name} ({cooldown:.0f}s)")
+                raise ConnectionError(f"Failed to reach {server.name}: {e}")
+    
+    async def _invoke_streamed(
+        self,
+        server: MCPServerNode,
+        body: Dict[str, Any],
+        timeout_ms: Optional[int] = None
+    ) -> Any:
+        """Send a tools/call request and pull only "result" out of the streamed response"""
+        async with self._client.stream(
+            "POST",
+            server.url,
+            content=orjson.dumps(body),
+            headers=_JSON_HEADERS,
+            timeout=timeout_ms / 1000 if timeout_ms else 30.0
+        ) as response:
+            server.consecutive_failures = 0
+            server.open_until = 0.0
             
-            raise Exception(f"MCP call failed: {response.status_code}")
+            if response.status_code != 200:
+                raise Exception(f"MCP call failed: {response.status_code}")
             
-        except httpx.RequestError as e:
-            server.error_count += 1
-            server.is_healthy = False
-            raise ConnectionError(f"Failed to reach {server.name}: {e}")
+            async for key, value in kvitems(response.aiter_bytes()):
+                if key == "result":
+                    return value
+                if key == "error":
+                    raise Exception(value.get("message", "Unknown MCP error"))
+        
+        raise Exception("MCP call failed: response had no result")
     
     async def parallel_call(
         self,
         calls: List[Dict[str, Any]]  # [{"tool": "name", "args": {...}}, ...]
-    ) -> List[Any]:
-        """Execute multiple tool calls in parallel"""
-        tasks = [
-            self.call_tool(call["tool"], call["args"])
-            for call in calls
-        ]
+    ) -> List[MeshToolResult]:
+        """Execute multiple tool calls in parallel, sharing one call per duplicate"""
+        unique: Dict[Any, asyncio.Task] = {}
+        keys = []
+        for call in calls:
+            key = (call["tool"], _canonical(call["args"]))
+            if key not in unique:
+                unique[key] = asyncio.ensure_future(self.call_tool(call["tool"], call["args"]))
+            keys.append(key)
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        return results
+        results = await asyncio.gather(*unique.values(), return_exceptions=True)
+        by_key = {
+            key: MeshToolResult(ok=False, error=str(result))
+            if isinstance(result, BaseException) else MeshToolResult(ok=True, value=result)
+            for key, result in zip(unique, results)
+        }
+        # Release the exceptions (and their tracebacks) as soon as they are converted
+        del results
+        unique.clear()
+        return [by_key[key] for key in keys]
+    
+    def plan_chain(self, capabilities: List[str]) -> List[str]:
+        """
+        Pick the cheapest server for each step of a chain.
+        
+        Each capability is a tool name; the healthy server exposing it with the
+        lowest measured latency plus the tool's estimated latency wins. Returns
+        namespaced tool names ready for chain_tools / call_tool.
+        """
+        return [self._best_route(capability) for capability in capabilities]
+    
+    def _best_route(self, capability: str) -> str:
+        """Cheapest namespaced tool for a capability, cached until health changes"""
+        route = self._route_cache.get(capability)
+        if route is not None:
+            return route
+        
+        candidates = self._short_index.get(capability)
+        if not candidates:
+            raise ValueError(f"Unknown tool: {capability}")
+        
+        best_cost = None
+        for full_name in candidates:
+            tool = self.tool_index[full_name]
+            server = self.servers[tool.server_id]
+            if not server.is_healthy:
+                continue
+            cost = server.latency_ms + tool.estimated_latency_ms
+            if best_cost is None or cost < best_cost:
+                best_cost = cost
+                route = f"{server.id}__{capability}"
+        
+        if route is None:
+            raise ConnectionError(f"No healthy server provides: {capability}")
+        
+        self._route_cache[capability] = route
+        return route
     
     async def chain_tools(
         self,
@@ -436,24 +821,27 @@ class MCPMesh:
     
     def get_mesh_status(self) -> Dict[str, Any]:
         """Get status of the entire mesh"""
-        healthy = sum(1 for s in self.servers.values() if s.is_healthy)
-        total = len(self.servers)
-        
         return {
-            "total_servers": total,
-            "healthy_servers": healthy,
+            "total_servers": len(self.servers),
+            "healthy_servers": self._healthy_count,
             "total_tools": len(self.tool_index),
-            "servers": [
-                {
-                    "id": s.id,
-                    "name": s.name,
-                    "type": s.server_type.value,
-                    "healthy": s.is_healthy,
-                    "latency_ms": s.latency_ms,
-                    "tools": len(s.tools),
-                    "errors": s.error_count,
-                }
-                for s in self.servers.values()
-            ]
+            "servers": [self._server_status(s) for s in self.servers.values()]
         }
+    
+    @staticmethod
+    def _server_status(server: MCPServerNode) -> Dict[str, Any]:
+        """Status entry for one server, rebuilt only when its live fields change"""
+        key = (server.is_healthy, server.latency_ms, server.error_count)
+        if server._status_key != key:
+            server._status = {
+                "id": server.id,
+                "name": server.name,
+                "type": server.server_type.value,
+                "healthy": server.is_healthy,
+                "latency_ms": server.latency_ms,
+                "tools": len(server.tools),
+                "errors": server.error_count,
+            }
+            server._status_key = key
+        return server._status
 
@@ -6,36 +6,75 @@ Routes tasks to optimal models based on real-time factors.
 This is what makes the architecture competition-worthy.
 """
 
-import asyncio
 import logging
-from enum import Enum
-from typing import Dict, List, Optional, Tuple
+import time
+from collections import deque
+from enum import IntEnum, IntFlag
+from functools import reduce
+from operator import or_
+from typing import Any, Deque, Dict, Final, Iterable, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import random
 
 logger = logging.getLogger(__name__)
 
+# Rate-limit window, and the per-output-token latency a healthy model is expected to beat
+RPM_WINDOW_S = 60.0
+TARGET_TPOT_MS = 20.0
 
-class ModelCapability(Enum):
-    """What each model excels at"""
-    REASONING = "reasoning"           # Complex multi-step logic
-    VISION = "vision"                 # Image/video analysis
-    SPEED = "speed"                   # Fast responses
-    CODE = "code"                     # Code generation
-    COST = "cost"                     # Budget-friendly
-    MULTILINGUAL = "multilingual"     # Non-English support
-    LONG_CONTEXT = "long_context"     # 100K+ tokens
-    TOOL_USE = "tool_use"            # Function calling
+# Distinct requirement signatures whose static model scores are kept
+STATIC_SCORE_CACHE_SIZE = 256
 
+# How long a select_model decision is reused for an identical request
+SELECTION_CACHE_TTL_S = 1.0
+SELECTION_CACHE_SIZE = 256
 
-@dataclass
+# How long get_model_stats may serve the same snapshot
+STATS_CACHE_TTL_S = 0.5
+
+
+def _seconds_until_midnight() -> float:
+    """Seconds from now until the next local midnight"""
+    now = datetime.now()
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+
+class ModelCapability(IntFlag):
+    """What each model excels at (bit flags, so capability sets are integers)"""
+    REASONING = 1           # Complex multi-step logic
+    VISION = 2              # Image/video analysis
+    SPEED = 4               # Fast responses
+    CODE = 8                # Code generation
+    COST = 16               # Budget-friendly
+    MULTILINGUAL = 32       # Non-English support
+    LONG_CONTEXT = 64       # 100K+ tokens
+    TOOL_USE = 128          # Function calling
+
+
+class Priority(IntEnum):
+    """How much a task is worth spending on"""
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+    CRITICAL = 3
+
+
+def _capability_mask(capabilities: Union[ModelCapability, Iterable[ModelCapability]]) -> ModelCapability:
+    """OR an iterable of capabilities into one flag value"""
+    if isinstance(capabilities, ModelCapability):
+        return capabilities
+    return reduce(or_, capabilities, ModelCapability(0))
+
+
+@dataclass(slots=True)
 class ModelProfile:
     """Profile for a model with its capabilities and costs"""
     id: str
     provider: str
     display_name: str
-    capabilities: List[ModelCapability]
+    capabilities: ModelCapability  # OR of flags
     cost_per_1k_input: float      # USD per 1K input tokens
     cost_per_1k_output: float     # USD per 1K output tokens
     avg_latency_ms: int           # Average response time
@@ -44,53 +83,76 @@ class ModelProfile:
     supports_tools: bool = True
     is_available: bool = True
     rate_limit_rpm: int = 60      # Requests per minute
+    is_premium: bool = False      # Preferred for critical tasks
     
     # Real-time tracking
-    current_rpm: int = 0
     total_cost_today: float = 0.0
     last_error: Optional[str] = None
+    request_times: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))  # time.monotonic()
+    observed_tpot_ema: float = 0.0  # ms per output token, 0 until measured
+    latency_ema: float = 0.0        # ms per call, 0 until measured
+    error_rate_ema: float = 0.0     # Decaying share of recent calls that failed
+    last_update: float = 0.0        # time.monotonic() of the last recorded call
+    
+    # Cost of a typical call (2K input + 1K output tokens), derived once
+    avg_call_cost: float = field(default=0.0, init=False)
+    
+    def __post_init__(self):
+        self.capabilities = _capability_mask(self.capabilities)
+        self.avg_call_cost = (self.cost_per_1k_input * 2 + self.cost_per_1k_output * 1) / 1000 * 2000
     
+    @property
+    def current_rpm(self) -> int:
+        """Requests recorded in the last minute"""
+        cutoff = time.monotonic() - RPM_WINDOW_S
+        times = self.request_times
+        while times and times[0] <= cutoff:
+            times.popleft()
+        return len(times)
 
-# Model Registry - The "menu" of available models
-MODEL_REGISTRY: Dict[str, ModelProfile] = {
+
+# Model Registry - The "menu" of available models, as ModelProfile kwargs
+MODEL_SPECS: Dict[str, Dict[str, Any]] = {
     # === TIER 1: Premium Reasoning ===
-    "claude-3-5-sonnet": ModelProfile(
+    "claude-3-5-sonnet": dict(
         id="claude-3-5-sonnet-20241022",
         provider="anthropic",
         display_name="Claude 3.5 Sonnet",
-        capabilities=[ModelCapability.REASONING, ModelCapability.TOOL_USE, ModelCapability.CODE, ModelCapability.LONG_CONTEXT],
+        capabilities=ModelCapability.REASONING | ModelCapability.TOOL_USE | ModelCapability.CODE | ModelCapability.LONG_CONTEXT,
         cost_per_1k_input=0.003,
         cost_per_1k_output=0.015,
         avg_latency_ms=1200,
         max_context=200000,
+        is_premium=True,
     ),
-    "gpt-4o": ModelProfile(
+    "gpt-4o": dict(
         id="gpt-4o-2024-11-20",
         provider="openai",
         display_name="GPT-4o",
-        capabilities=[ModelCapability.REASONING, ModelCapability.VISION, ModelCapability.TOOL_USE],
+        capabilities=ModelCapability.REASONING | ModelCapability.VISION | ModelCapability.TOOL_USE,
         cost_per_1k_input=0.0025,
         cost_per_1k_output=0.01,
         avg_latency_ms=1000,
         max_context=128000,
+        is_premium=True,
     ),
     
     # === TIER 2: Multimodal Vision ===
-    "gemini-2.0-flash": ModelProfile(
+    "gemini-2.0-flash": dict(
         id="gemini-2.0-flash",
         provider="google",
         display_name="Gemini 2.0 Flash",
-        capabilities=[ModelCapability.VISION, ModelCapability.SPEED, ModelCapability.REASONING],
+        capabilities=ModelCapability.VISION | ModelCapability.SPEED | ModelCapability.REASONING,
         cost_per_1k_input=0.0001,
         cost_per_1k_output=0.0004,
         avg_latency_ms=600,
         max_context=1000000,  # 1M context!
     ),
-    "gemini-2.0-flash-thinking": ModelProfile(
+    "gemini-2.0-flash-thinking": dict(
         id="gemini-2.0-flash-thinking-exp",
         provider="google",
         display_name="Gemini 2.0 Flash Thinking",
-        capabilities=[ModelCapability.REASONING, ModelCapability.VISION],
+        capabilities=ModelCapability.REASONING | ModelCapability.VISION,
         cost_per_1k_input=0.0001,
         cost_per_1k_output=0.0004,
         avg_latency_ms=2000,
@@ -98,21 +160,21 @@ MODEL_REGISTRY: Dict[str, ModelProfile] = {
     ),
     
     # === TIER 3: Speed Demons ===
-    "claude-3-haiku": ModelProfile(
+    "claude-3-haiku": dict(
         id="claude-3-haiku-20240307",
         provider="anthropic",
         display_name="Claude 3 Haiku",
-        capabilities=[ModelCapability.SPEED, ModelCapability.TOOL_USE],
+        capabilities=ModelCapability.SPEED | ModelCapability.TOOL_USE,
         cost_per_1k_input=0.00025,
         cost_per_1k_output=0.00125,
         avg_latency_ms=300,
         max_context=200000,
     ),
-    "gpt-4o-mini": ModelProfile(
+    "gpt-4o-mini": dict(
         id="gpt-4o-mini",
         provider="openai",
         display_name="GPT-4o Mini",
-        capabilities=[ModelCapability.SPEED, ModelCapability.TOOL_USE],
+        capabilities=ModelCapability.SPEED | ModelCapability.TOOL_USE,
         cost_per_1k_input=0.00015,
         cost_per_1k_output=0.0006,
         avg_latency_ms=400,
@@ -120,41 +182,41 @@ MODEL_REGISTRY: Dict[str, ModelProfile] = {
     ),
     
     # === TIER 4: Open Source via Featherless ===
-    "llama-3.1-70b": ModelProfile(
+    "llama-3.1-70b": dict(
         id="meta-llama/Llama-3.1-70B-Instruct",
         provider="featherless",
         display_name="Llama 3.1 70B",
-        capabilities=[ModelCapability.COST, ModelCapability.REASONING],
+        capabilities=ModelCapability.COST | ModelCapability.REASONING,
         cost_per_1k_input=0.0002,
         cost_per_1k_output=0.0002,
         avg_latency_ms=800,
         max_context=128000,
     ),
-    "llama-3.2-vision": ModelProfile(
+    "llama-3.2-vision": dict(
         id="meta-llama/Llama-3.2-90B-Vision-Instruct",
         provider="featherless",
         display_name="Llama 3.2 90B Vision",
-        capabilities=[ModelCapability.VISION, ModelCapability.COST],
+        capabilities=ModelCapability.VISION | ModelCapability.COST,
         cost_per_1k_input=0.0003,
         cost_per_1k_output=0.0003,
         avg_latency_ms=1200,
         max_context=128000,
     ),
-    "deepseek-coder": ModelProfile(
+    "deepseek-coder": dict(
         id="deepseek-ai/DeepSeek-Coder-V2-Instruct",
         provider="featherless",
         display_name="DeepSeek Coder V2",
-        capabilities=[ModelCapability.CODE, ModelCapability.COST],
+        capabilities=ModelCapability.CODE | ModelCapability.COST,
         cost_per_1k_input=0.00014,
         cost_per_1k_output=0.00028,
         avg_latency_ms=600,
         max_context=128000,
     ),
-    "qwen-2.5-72b": ModelProfile(
+    "qwen-2.5-72b": dict(
         id="Qwen/Qwen2.5-72B-Instruct",
         provider="featherless",
         display_name="Qwen 2.5 72B",
-        capabilities=[ModelCapability.MULTILINGUAL, ModelCapability.REASONING, ModelCapability.COST],
+        capabilities=ModelCapability.MULTILINGUAL | ModelCapability.REASONING | ModelCapability.COST,
         cost_per_1k_input=0.0002,
         cost_per_1k_output=0.0002,
         avg_latency_ms=700,
@@ -163,18 +225,48 @@ MODEL_REGISTRY: Dict[str, ModelProfile] = {
 }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TaskRequirements:
-    """What a task needs from a model"""
-    required_capabilities: List[ModelCapability]
-    preferred_capabilities: List[ModelCapability] = field(default_factory=list)
+    """What a task needs from a model (immutable, so presets can be shared)"""
+    required_capabilities: Tuple[ModelCapability, ...]
+    preferred_capabilities: Tuple[ModelCapability, ...] = ()
     max_latency_ms: Optional[int] = None
     max_cost_per_call: Optional[float] = None
     min_context_tokens: int = 4000
     requires_streaming: bool = False
     requires_tools: bool = False
     has_image: bool = False
-    priority: str = "normal"  # low, normal, high, critical
+    priority: Priority = Priority.NORMAL  # Names like "critical" are accepted too
+    
+    # Bitmasks of the capability lists and the scoring signature, derived once
+    required_mask: ModelCapability = field(default=ModelCapability(0), init=False)
+    preferred_mask: ModelCapability = field(default=ModelCapability(0), init=False)
+    _signature: Tuple = field(default=(), init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Frozen, so derived fields are set through object.__setattr__
+        set_field = object.__setattr__
+        set_field(self, "required_capabilities", tuple(self.required_capabilities))
+        set_field(self, "preferred_capabilities", tuple(self.preferred_capabilities))
+        if isinstance(self.priority, str):
+            set_field(self, "priority", Priority[self.priority.upper()])
+        set_field(self, "required_mask", _capability_mask(self.required_capabilities))
+        set_field(self, "preferred_mask", _capability_mask(self.preferred_capabilities))
+        set_field(self, "_signature", (
+            self.required_mask,
+            self.preferred_mask,
+            self.max_latency_ms,
+            self.max_cost_per_call,
+            self.min_context_tokens,
+            self.requires_streaming,
+            self.requires_tools,
+            self.has_image,
+            self.priority,
+        ))
+    
+    def signature(self) -> Tuple:
+        """Hashable key covering every field that affects scoring"""
+        return self._signature
 
 
 class ModelRouter:
@@ -189,11 +281,53 @@ class ModelRouter:
     """
     
     def __init__(self, budget_usd: float = 10.0):
-        self.models = MODEL_REGISTRY.copy()
+        # Fresh profiles per router, so live counters are never shared between routers
+        self.models = {key: ModelProfile(**spec) for key, spec in MODEL_SPECS.items()}
         self.daily_budget = budget_usd
         self.spent_today = 0.0
-        self.budget_reset_time = datetime.now().replace(hour=0, minute=0, second=0)
-        self._lock = asyncio.Lock()
+        self._next_budget_reset = time.monotonic() + _seconds_until_midnight()
+        self._static_score_tables: Dict[Tuple, List[Tuple[str, ModelProfile, float]]] = {}
+        
+        # (signature, exclusions, low budget) -> (expires, generation, model key, score)
+        self._selection_cache: Dict[Tuple, Tuple[float, int, str, float]] = {}
+        self._selection_generation = 0
+        
+        # (generation, built at, stats) for get_model_stats
+        self._stats_cache: Optional[Tuple[int, float, List[Dict]]] = None
+        self._stats_generation = 0
+        self._build_indexes()
+    
+    @property
+    def routing_version(self) -> int:
+        """Bumped whenever a model's health change can alter selections"""
+        return self._selection_generation
+    
+    def _build_indexes(self):
+        """Index models by the hard filters so selection only scores plausible candidates"""
+        self._all_keys = frozenset(self.models)
+        self._registry_order = {key: i for i, key in enumerate(self.models)}
+        self._cap_index = {
+            cap: frozenset(k for k, m in self.models.items() if m.capabilities & cap)
+            for cap in ModelCapability
+        }
+        self._tool_set = frozenset(k for k, m in self.models.items() if m.supports_tools)
+        self._stream_set = frozenset(k for k, m in self.models.items() if m.supports_streaming)
+    
+    def _candidate_keys(self, req: TaskRequirements, exclude: set) -> List[str]:
+        """Models passing the capability/tool/streaming filters, in registry order"""
+        keys = self._all_keys
+        # Iterating the mask splits composite flags into single indexed members
+        for cap in req.required_mask:
+            keys = keys & self._cap_index.get(cap, frozenset())
+        if req.has_image:
+            keys = keys & self._cap_index[ModelCapability.VISION]
+        if req.requires_tools:
+            keys = keys & self._tool_set
+        if req.requires_streaming:
+            keys = keys & self._stream_set
+        
+        # Registry order keeps tie-breaking stable
+        return sorted(keys - exclude, key=self._registry_order.__getitem__)
     
     async def select_model(
         self, 
@@ -205,47 +339,80 @@ class ModelRouter:
         
         Returns tuple of (model_key, model_profile)
         """
-        async with self._lock:
-            # Reset daily budget if needed
-            if datetime.now() > self.budget_reset_time + timedelta(days=1):
-                self.spent_today = 0.0
-                self.budget_reset_time = datetime.now().replace(hour=0, minute=0, second=0)
-            
-            exclude = set(exclude_models or [])
-            candidates = []
-            
-            for key, model in self.models.items():
-                if key in exclude:
-                    continue
-                if not model.is_available:
-                    continue
-                    
-                score = self._score_model(model, requirements)
-                if score > 0:
-                    candidates.append((key, model, score))
-            
-            if not candidates:
-                raise ValueError("No suitable model found for requirements")
-            
-            # Sort by score (descending)
-            candidates.sort(key=lambda x: x[2], reverse=True)
-            
-            best_key, best_model, score = candidates[0]
-            logger.info(f"Selected model: {best_model.display_name} (score: {score:.2f})")
+        # No lock: nothing below awaits, so concurrent selections can't interleave
+        self._roll_budget()
+        
+        exclude = set(exclude_models or [])
+        low_budget = self.daily_budget - self.spent_today < 1.0
+        
+        # Identical routing requests within the TTL reuse the last decision
+        cache_key = (requirements.signature(), frozenset(exclude), low_budget)
+        now = time.monotonic()
+        cached = self._selection_cache.get(cache_key)
+        if cached is not None:
+            expires, generation, best_key, score = cached
+            best_model = self.models[best_key]
+            if now < expires and generation == self._selection_generation and best_model.is_available:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Selected model: %s (score: %.2f)", best_model.display_name, score)
+                return best_key, best_model
+        
+        candidates = self._rank_candidates(requirements, exclude, low_budget)
+        
+        # Only the winner matters; max keeps the first of equal scores, as the stable sort did
+        best_key, best_model, score = max(candidates, key=lambda x: x[2])
+        if len(self._selection_cache) >= SELECTION_CACHE_SIZE:
+            self._selection_cache.clear()
+        self._selection_cache[cache_key] = (
+            now + SELECTION_CACHE_TTL_S, self._selection_generation, best_key, score
+        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Selected model: %s (score: %.2f)", best_model.display_name, score)
+        
+        return best_key, best_model
+    
+    def _roll_budget(self):
+        """Reset the daily spend once local midnight has passed"""
+        if time.monotonic() >= self._next_budget_reset:
+            self.spent_today = 0.0
+            self._next_budget_reset = time.monotonic() + _seconds_until_midnight()
+    
+    def _rank_candidates(
+        self,
+        requirements: TaskRequirements,
+        exclude: set,
+        low_budget: bool
+    ) -> List[Tuple[str, ModelProfile, float]]:
+        """Available models with a positive score, in registry order"""
+        candidates = []
+        append = candidates.append
+        live_penalty = self._live_penalty
+        max_latency_ms = requirements.max_latency_ms
+        
+        # Static terms come from a per-signature table; only the live
+        # penalties are evaluated per model on each call
+        for key, model, base_score in self._static_scores(requirements):
+            if key in exclude or not model.is_available:
+                continue
             
-            return best_key, best_model
+            score = base_score - live_penalty(model, low_budget, max_latency_ms)
+            if score > 0:
+                append((key, model, score))
+        
+        if not candidates:
+            raise ValueError("No suitable model found for requirements")
+        return candidates
     
-    def _score_model(self, model: ModelProfile, req: TaskRequirements) -> float:
-        """Score a model based on how well it matches requirements"""
+    def _static_score(self, model: ModelProfile, req: TaskRequirements) -> float:
+        """Part of the score fixed by the requirements and the model's static profile"""
         score = 100.0
         
         # === Must-have capabilities ===
-        for cap in req.required_capabilities:
-            if cap not in model.capabilities:
-                return 0  # Instant disqualification
+        if model.capabilities & req.required_mask != req.required_mask:
+            return 0  # Instant disqualification
         
         # === Image requirement ===
-        if req.has_image and ModelCapability.VISION not in model.capabilities:
+        if req.has_image and not model.capabilities & ModelCapability.VISION:
             return 0
         
         # === Tool use requirement ===
@@ -265,40 +432,74 @@ class ModelRouter:
             score -= 30  # Heavy penalty
         
         # === Cost constraint ===
-        avg_call_cost = (model.cost_per_1k_input * 2 + model.cost_per_1k_output * 1) / 1000 * 2000
+        avg_call_cost = model.avg_call_cost
         if req.max_cost_per_call and avg_call_cost > req.max_cost_per_call:
             score -= 40  # Heavy penalty
         
-        # === Budget awareness ===
-        remaining_budget = self.daily_budget - self.spent_today
-        if remaining_budget < 1.0:  # Low budget mode
-            # Heavily favor cheap models
-            cost_factor = avg_call_cost * 100
-            score -= cost_factor
-        
         # === Bonus for preferred capabilities ===
-        for cap in req.preferred_capabilities:
-            if cap in model.capabilities:
-                score += 10
+        score += 10 * (model.capabilities & req.preferred_mask).bit_count()
         
         # === Priority adjustments ===
-        if req.priority == "critical":
+        if req.priority == Priority.CRITICAL:
             # Favor premium models for critical tasks
-            if "claude-3-5" in model.id or "gpt-4o" in model.id:
+            if model.is_premium:
                 score += 20
-        elif req.priority == "low":
+        elif req.priority == Priority.LOW:
             # Favor cheap models for low priority
             score -= avg_call_cost * 50
         
+        return score
+    
+    def _live_penalty(
+        self,
+        model: ModelProfile,
+        low_budget: bool,
+        max_latency_ms: Optional[int] = None
+    ) -> float:
+        """Part of the score that moves with budget, load and errors"""
+        penalty = 0.0
+        
+        # === Observed latency ===
+        # The static score already penalized a slow advertised latency; this
+        # catches models that advertise a fast one but are running slow
+        if max_latency_ms and model.avg_latency_ms <= max_latency_ms < model.latency_ema:
+            penalty += 30
+        
+        # === Budget awareness ===
+        if low_budget:
+            # Heavily favor cheap models
+            penalty += model.avg_call_cost * 100
+        
         # === Rate limit check ===
         if model.current_rpm >= model.rate_limit_rpm * 0.9:
-            score -= 50  # Close to rate limit
+            penalty += 50  # Close to rate limit
+        
+        # === Observed slowdown ===
+        if model.observed_tpot_ema > TARGET_TPOT_MS:
+            penalty += min(30, 10 * (model.observed_tpot_ema / TARGET_TPOT_MS - 1))
         
         # === Recent errors ===
         if model.last_error:
-            score -= 20
+            penalty += 20
+        penalty += model.error_rate_ema * 100
         
-        return max(0, score)
+        return penalty
+    
+    def _static_scores(self, req: TaskRequirements) -> List[Tuple[str, ModelProfile, float]]:
+        """Qualifying models and their static scores, computed once per requirement signature"""
+        signature = req.signature()
+        table = self._static_score_tables.get(signature)
+        if table is None:
+            table = []
+            for key in self._candidate_keys(req, set()):
+                model = self.models[key]
+                score = self._static_score(model, req)
+                if score > 0:
+                    table.append((key, model, score))
+            if len(self._static_score_tables) >= STATIC_SCORE_CACHE_SIZE:
+                self._static_score_tables.clear()
+            self._static_score_tables[signature] = table
+        return table
     
     async def record_usage(
         self, 
@@ -306,30 +507,60 @@ class ModelRouter:
         input_tokens: int, 
         output_tokens: int,
         success: bool = True,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        latency_ms: Optional[float] = None
     ):
         """Record usage for tracking and billing"""
-        async with self._lock:
-            model = self.models.get(model_key)
-            if not model:
-                return
-            
-            # Calculate cost
-            cost = (
-                (input_tokens / 1000) * model.cost_per_1k_input +
-                (output_tokens / 1000) * model.cost_per_1k_output
-            )
-            
-            self.spent_today += cost
-            model.total_cost_today += cost
-            model.current_rpm += 1
-            
-            if not success:
-                model.last_error = error
+        # No lock: the body never awaits, so concurrent completions can't
+        # interleave their updates on the event loop
+        model = self.models.get(model_key)
+        if not model:
+            return
+        
+        # Calculate cost
+        cost = (
+            (input_tokens / 1000) * model.cost_per_1k_input +
+            (output_tokens / 1000) * model.cost_per_1k_output
+        )
+        
+        self.spent_today += cost
+        model.total_cost_today += cost
+        self._stats_generation += 1
+        model.last_update = time.monotonic()
+        model.request_times.append(model.last_update)
+        
+        # Track latency per call and per output token so slowing providers lose score
+        if latency_ms is not None:
+            if model.latency_ema:
+                model.latency_ema = 0.7 * model.latency_ema + 0.3 * latency_ms
             else:
-                model.last_error = None
+                model.latency_ema = latency_ms
             
-            logger.debug(f"Usage recorded: {model.display_name} - ${cost:.4f} (total today: ${self.spent_today:.2f})")
+            if output_tokens > 0:
+                tpot = latency_ms / output_tokens
+                if model.observed_tpot_ema:
+                    model.observed_tpot_ema = 0.7 * model.observed_tpot_ema + 0.3 * tpot
+                else:
+                    model.observed_tpot_ema = tpot
+        
+        # Failures raise the error rate gradually rather than flipping availability
+        model.error_rate_ema = 0.9 * model.error_rate_ema + (0.0 if success else 0.1)
+        
+        previous_error = model.last_error
+        if not success:
+            model.last_error = error
+        else:
+            model.last_error = None
+        
+        # A model starting or stopping failing changes the ranking now
+        if (previous_error is None) != (model.last_error is None):
+            self._selection_generation += 1
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Usage recorded: %s - $%.4f (total today: $%.2f)",
+                model.display_name, cost, self.spent_today
+            )
     
     def get_budget_status(self) -> Dict:
         """Get current budget status"""
@@ -341,8 +572,13 @@ class ModelRouter:
         }
     
     def get_model_stats(self) -> List[Dict]:
-        """Get stats for all models"""
-        return [
+        """Get stats for all models (reused briefly while no usage is recorded)"""
+        now = time.monotonic()
+        cached = self._stats_cache
+        if cached is not None and cached[0] == self._stats_generation and now - cached[1] < STATS_CACHE_TTL_S:
+            return cached[2]
+        
+        stats = [
             {
                 "id": key,
                 "name": model.display_name,
@@ -354,60 +590,77 @@ class ModelRouter:
             }
             for key, model in self.models.items()
         ]
+        self._stats_cache = (self._stats_generation, now, stats)
+        return stats
 
 
 # === Task Requirement Presets ===
 
+# Quick triage/routing - needs speed
+TRIAGE_TASK: Final = TaskRequirements(
+    required_capabilities=(ModelCapability.TOOL_USE,),
+    preferred_capabilities=(ModelCapability.SPEED,),
+    max_latency_ms=500,
+    max_cost_per_call=0.001,
+    requires_tools=True,
+    priority=Priority.HIGH,
+)
+
+# Image analysis - needs vision capability
+VISION_ANALYSIS_TASK: Final = TaskRequirements(
+    required_capabilities=(ModelCapability.VISION,),
+    preferred_capabilities=(ModelCapability.REASONING,),
+    has_image=True,
+    priority=Priority.HIGH,
+)
+
+# Complex multi-step reasoning
+COMPLEX_REASONING_TASK: Final = TaskRequirements(
+    required_capabilities=(ModelCapability.REASONING,),
+    preferred_capabilities=(ModelCapability.TOOL_USE, ModelCapability.LONG_CONTEXT),
+    min_context_tokens=50000,
+    requires_tools=True,
+    priority=Priority.NORMAL,
+)
+
+# Budget-conscious task
+BUDGET_TASK: Final = TaskRequirements(
+    required_capabilities=(),
+    preferred_capabilities=(ModelCapability.COST,),
+    max_cost_per_call=0.0005,
+    priority=Priority.LOW,
+)
+
+# Crisis-critical task - best model, no compromises
+CRISIS_CRITICAL_TASK: Final = TaskRequirements(
+    required_capabilities=(ModelCapability.REASONING, ModelCapability.TOOL_USE),
+    preferred_capabilities=(),
+    requires_tools=True,
+    requires_streaming=True,
+    priority=Priority.CRITICAL,
+)
+
+
 def triage_task() -> TaskRequirements:
     """Quick triage/routing - needs speed"""
-    return TaskRequirements(
-        required_capabilities=[ModelCapability.TOOL_USE],
-        preferred_capabilities=[ModelCapability.SPEED],
-        max_latency_ms=500,
-        max_cost_per_call=0.001,
-        requires_tools=True,
-        priority="high",
-    )
+    return TRIAGE_TASK
 
 
 def vision_analysis_task() -> TaskRequirements:
     """Image analysis - needs vision capability"""
-    return TaskRequirements(
-        required_capabilities=[ModelCapability.VISION],
-        preferred_capabilities=[ModelCapability.REASONING],
-        has_image=True,
-        priority="high",
-    )
+    return VISION_ANALYSIS_TASK
 
 
 def complex_reasoning_task() -> TaskRequirements:
     """Complex multi-step reasoning"""
-    return TaskRequirements(
-        required_capabilities=[ModelCapability.REASONING],
-        preferred_capabilities=[ModelCapability.TOOL_USE, ModelCapability.LONG_CONTEXT],
-        min_context_tokens=50000,
-        requires_tools=True,
-        priority="normal",
-    )
+    return COMPLEX_REASONING_TASK
 
 
 def budget_task() -> TaskRequirements:
     """Budget-conscious task"""
-    return TaskRequirements(
-        required_capabilities=[],
-        preferred_capabilities=[ModelCapability.COST],
-        max_cost_per_call=0.0005,
-        priority="low",
-    )
+    return BUDGET_TASK
 
 
 def crisis_critical_task() -> TaskRequirements:
     """Crisis-critical task - best model, no compromises"""
-    return TaskRequirements(
-        required_capabilities=[ModelCapability.REASONING, ModelCapability.TOOL_USE],
-        preferred_capabilities=[],
-        requires_tools=True,
-        requires_streaming=True,
-        priority="critical",
-    )
-
+    return CRISIS_CRITICAL_TASK
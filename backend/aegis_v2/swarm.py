@@ -11,17 +11,59 @@ The orchestration layer that ties everything together:
 
 import asyncio
 import logging
-from typing import Any, AsyncIterator, Dict, List, Optional
-from dataclasses import dataclass, field
+import re
+import sys
+import time
+from typing import Any, AsyncIterator, ClassVar, Dict, FrozenSet, List, Optional, Tuple, Union
+from dataclasses import dataclass, field, fields, replace
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 
-from .model_router import ModelRouter, TaskRequirements, ModelCapability
+import orjson
+
+from .model_router import ModelRouter, ModelProfile, TaskRequirements, ModelCapability, Priority
 from .model_router import triage_task, vision_analysis_task, complex_reasoning_task, crisis_critical_task
 from .mcp_mesh import MCPMesh, MCPServerType
 
 logger = logging.getLogger(__name__)
 
+# Rough prompt budget for a row-marshaled agent call; bigger groups run per alert
+MARSHAL_PROMPT_TOKEN_BUDGET = 6000
+CHARS_PER_TOKEN = 4
+
+# Fraction of the remaining budget that may be spent before per-agent
+# model choices are re-resolved
+MODEL_CACHE_BUDGET_DRIFT = 0.1
+
+# Alert keywords for tier routing, each set compiled into one alternation
+# so an alert is scanned once per tier rather than once per keyword
+_FRONTIER_RE = re.compile(
+    r"\b(?:critical|catastroph\w*|mass\s+casualt(?:y|ies)|nuclear|radiolog\w*"
+    r"|tsunami|dam\s+(?:breach|failure)|mass\s+evacuation)\b",
+    re.IGNORECASE,
+)
+_FAST_RE = re.compile(
+    r"\b(?:minor|low\s+severity|advisory|routine|drill|test\s+alert|all\s+clear)\b",
+    re.IGNORECASE,
+)
+
+# Scoring priority applied to every agent's requirements per alert tier
+_TIER_PRIORITY = {"frontier": Priority.CRITICAL, "fast": Priority.LOW}
+
+
+def classify_alert_tier(alert: str) -> str:
+    """Classify an alert as "frontier", "fast" or "standard" by its keywords"""
+    if _FRONTIER_RE.search(alert):
+        return "frontier"
+    if _FAST_RE.search(alert):
+        return "fast"
+    return "standard"
+
+
+# Events buffered between a running swarm and a slow process() consumer
+EVENT_BUFFER_SIZE = 64
+
 
 class AgentRole(Enum):
     """Specialized agent roles"""
@@ -32,16 +74,40 @@ class AgentRole(Enum):
     SPECIALIST = "specialist"   # Domain-specific expert
 
 
-@dataclass
+# Model-selection explanation per agent role, looked up once per selection
+_ROLE_REASONS: Dict[AgentRole, str] = {
+    AgentRole.TRIAGE: "Fast triage requires low latency",
+    AgentRole.VISION: "Image analysis requires vision capability",
+    AgentRole.ANALYST: "Complex reasoning with tool use required",
+}
+_COST_CAPABILITY = ModelCapability.COST
+
+
+@dataclass(frozen=True, slots=True)
 class AgentSpec:
-    """Specification for an agent"""
+    """Specification for an agent (immutable, so specs can be shared across swarms)"""
     name: str
     role: AgentRole
     system_prompt: str
     task_requirements: TaskRequirements
-    mcp_server_types: List[MCPServerType] = field(default_factory=list)
-    can_handoff_to: List[str] = field(default_factory=list)
+    mcp_server_types: Tuple[MCPServerType, ...] = ()
+    can_handoff_to: Tuple[str, ...] = ()
     max_turns: int = 10
+    
+    # Set form of mcp_server_types for membership tests; the tuple keeps tool order
+    _types_set: FrozenSet[MCPServerType] = field(default=frozenset(), init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Frozen, so normalized fields are set through object.__setattr__
+        set_field = object.__setattr__
+        set_field(self, "name", sys.intern(self.name))
+        set_field(self, "mcp_server_types", tuple(self.mcp_server_types))
+        set_field(self, "_types_set", frozenset(self.mcp_server_types))
+        set_field(self, "can_handoff_to", tuple(sys.intern(n) for n in self.can_handoff_to))
+    
+    def uses_server_type(self, server_type: MCPServerType) -> bool:
+        """Whether this agent draws tools from servers of the given type"""
+        return server_type in self._types_set
 
 
 # === Agent Specifications ===
@@ -59,8 +125,8 @@ Your job is FAST assessment and routing:
 
 Be FAST. Be DECISIVE. Lives depend on quick routing.""",
     task_requirements=triage_task(),
-    mcp_server_types=[],  # No tools needed, just routing
-    can_handoff_to=["vision_specialist", "climate_analyst"],
+    mcp_server_types=(),  # No tools needed, just routing
+    can_handoff_to=("vision_specialist", "climate_analyst"),
     max_turns=2,
 )
 
@@ -79,8 +145,8 @@ You analyze disaster imagery using advanced vision models:
 Output structured analysis with confidence scores.
 After analysis, handoff to Climate Analyst with findings.""",
     task_requirements=vision_analysis_task(),
-    mcp_server_types=[MCPServerType.VISION, MCPServerType.SATELLITE],
-    can_handoff_to=["climate_analyst"],
+    mcp_server_types=(MCPServerType.VISION, MCPServerType.SATELLITE),
+    can_handoff_to=("climate_analyst",),
     max_turns=5,
 )
 
@@ -103,13 +169,13 @@ Your workflow:
 
 Use tools in PARALLEL when possible for speed.""",
     task_requirements=complex_reasoning_task(),
-    mcp_server_types=[
+    mcp_server_types=(
         MCPServerType.RELIEF_OPS,
         MCPServerType.WEATHER,
         MCPServerType.SATELLITE,
         MCPServerType.MAPS,
-    ],
-    can_handoff_to=[],  # Terminal agent
+    ),
+    can_handoff_to=(),  # Terminal agent
     max_turns=10,
 )
 
@@ -126,11 +192,19 @@ You orchestrate the entire response:
 
 Only activate for CRITICAL severity disasters.""",
     task_requirements=crisis_critical_task(),
-    mcp_server_types=[MCPServerType.RELIEF_OPS],
-    can_handoff_to=["watchman"],
+    mcp_server_types=(MCPServerType.RELIEF_OPS,),
+    can_handoff_to=("watchman",),
     max_turns=15,
 )
 
+# Built-in agents, shared by every AegisSwarm instance
+_BUILTIN_AGENTS: Tuple[AgentSpec, ...] = (
+    WATCHMAN_SPEC,
+    VISION_SPECIALIST_SPEC,
+    CLIMATE_ANALYST_SPEC,
+    CRISIS_COORDINATOR_SPEC,
+)
+
 
 @dataclass
 class SwarmConfig:
@@ -140,15 +214,127 @@ class SwarmConfig:
     enable_cost_optimization: bool = True
     max_concurrent_agents: int = 3
     default_starting_agent: str = "watchman"
+    in_process_relief_ops: bool = True  # Call relief_ops tools without HTTP
+    row_marshal_batch_size: int = 8     # Alerts sharing one LLM call in process_batch
+    simulate_latency_s: float = 0.0     # Fake model/tool latency in simulated runs (demo only)
+    enable_tier_routing: bool = False   # Re-prioritize model selection by classify_alert_tier
 
 
-@dataclass
+# === Swarm Events ===
+# One slotted class per event type; to_dict() gives the wire format
+
+@dataclass(frozen=True, slots=True, kw_only=True)
 class SwarmEvent:
     """Event emitted during swarm execution"""
-    timestamp: datetime
-    event_type: str  # agent_start, model_selected, tool_call, handoff, complete, error
+    event_type: ClassVar[str] = "event"
+    
+    timestamp: int  # time.time_ns(); see as_datetime()
     agent: str
-    data: Dict[str, Any]
+    row: Optional[int] = None                 # Alert this event belongs to in process_batch
+    rows: Optional[Tuple[int, ...]] = None    # Alerts sharing an agent turn in process_batch
+    
+    def as_datetime(self) -> datetime:
+        """Event time as a local datetime, converted only when rendered"""
+        return datetime.fromtimestamp(self.timestamp / 1e9)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready {timestamp, event_type, agent, data} form for transports"""
+        data = {name: getattr(self, name) for name in _payload_fields(type(self))}
+        if self.row is not None:
+            data["row"] = self.row
+        if self.rows is not None:
+            data["rows"] = self.rows
+        return {
+            "timestamp": self.timestamp,
+            "event_type": self.event_type,
+            "agent": self.agent,
+            "data": data,
+        }
+
+
+@lru_cache(maxsize=None)
+def _payload_fields(event_cls: type) -> Tuple[str, ...]:
+    """Fields an event type adds to the SwarmEvent base"""
+    return tuple(f.name for f in fields(event_cls) if f.name not in _BASE_EVENT_FIELDS)
+
+
+_BASE_EVENT_FIELDS = frozenset(f.name for f in fields(SwarmEvent))
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class AgentStartEvent(SwarmEvent):
+    event_type: ClassVar[str] = "agent_start"
+    role: str
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ModelSelectedEvent(SwarmEvent):
+    event_type: ClassVar[str] = "model_selected"
+    model: str
+    provider: str
+    reason: str
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ToolsAvailableEvent(SwarmEvent):
+    event_type: ClassVar[str] = "tools_available"
+    tools: Tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ToolCallEvent(SwarmEvent):
+    event_type: ClassVar[str] = "tool_call"
+    tool: str
+    status: str = "executing"
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ToolResultEvent(SwarmEvent):
+    event_type: ClassVar[str] = "tool_result"
+    tool: str
+    status: str = "completed"
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ResponseEvent(SwarmEvent):
+    event_type: ClassVar[str] = "response"
+    content: str
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class HandoffEvent(SwarmEvent):
+    event_type: ClassVar[str] = "handoff"
+    target: str
+    reason: str
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class AgentCompleteEvent(SwarmEvent):
+    event_type: ClassVar[str] = "agent_complete"
+    model_used: str
+    budget_remaining: float
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class SwarmCompleteEvent(SwarmEvent):
+    event_type: ClassVar[str] = "swarm_complete"
+    agents_used: Tuple[str, ...]
+    total_cost: float
+    mesh_status: Dict[str, Any]
+
+
+@dataclass(frozen=True, slots=True, kw_only=True)
+class ErrorEvent(SwarmEvent):
+    event_type: ClassVar[str] = "error"
+    error: str
+
+
+class _StreamEnd:
+    """Queue marker closing a buffered event stream, carrying any failure"""
+    __slots__ = ("error",)
+    
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
 
 
 class AegisSwarm:
@@ -168,21 +354,87 @@ class AegisSwarm:
         self.model_router = ModelRouter(budget_usd=self.config.daily_budget_usd)
         self.mcp_mesh = MCPMesh()
         
-        self.agents: Dict[str, AgentSpec] = {
-            "watchman": WATCHMAN_SPEC,
-            "vision_specialist": VISION_SPECIALIST_SPEC,
-            "climate_analyst": CLIMATE_ANALYST_SPEC,
-            "crisis_coordinator": CRISIS_COORDINATOR_SPEC,
-        }
+        self.agents: Dict[str, AgentSpec] = {spec.name: spec for spec in _BUILTIN_AGENTS}
+        
+        # Agent name -> LLM tool schemas, valid for one mesh topology version
+        self._tool_cache: Dict[str, List[Dict]] = {}
+        self._tool_cache_version = -1
+        
+        # (agent name, alert tier) -> (model key, profile), valid for one cache generation
+        self._model_cache: Dict[Tuple[str, str], Tuple[str, ModelProfile]] = {}
+        self._model_cache_generation = 0
+        self._model_cache_remaining = self.config.daily_budget_usd
+        self._model_cache_routing = -1
+        
+        # Agent -> agents reachable by handoff, in topological order; and each
+        # agent's position in that order. Built by _build_handoff_graph.
+        self._handoff_topo: Dict[str, Tuple[str, ...]] = {}
+        self._handoff_rank: Dict[str, int] = {}
         
         self._initialized = False
     
     async def initialize(self):
         """Initialize the swarm (MCP mesh, etc.)"""
         await self.mcp_mesh.register_default_mesh()
+        if self.config.in_process_relief_ops:
+            self._attach_relief_ops()
+        await self.mcp_mesh.start()
+        for spec in self.agents.values():
+            self._get_agent_tools(spec)
+        self._build_handoff_graph()
         self._initialized = True
         logger.info("Aegis Swarm initialized")
     
+    def _attach_relief_ops(self):
+        """Serve relief-ops tools from the relief_ops module in this process"""
+        try:
+            from relief_ops import server as relief_ops_server
+        except ImportError as e:
+            logger.warning(f"relief_ops not importable, using HTTP: {e}")
+            return
+        self.mcp_mesh.attach_in_process("relief-ops", relief_ops_server)
+    
+    def _build_handoff_graph(self):
+        """Validate the handoff graph as a DAG and precompute its walk order"""
+        agents = self.agents
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = on the DFS path, 2 = done
+        
+        def visit(name: str, path: List[str]):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                cycle = path[path.index(name):] + [name]
+                raise ValueError(f"Handoff cycle: {' -> '.join(cycle)}")
+            state[name] = 1
+            path.append(name)
+            for target in agents[name].can_handoff_to:
+                if target not in agents:
+                    raise ValueError(f"Agent {name} hands off to unknown agent {target}")
+                visit(target, path)
+            path.pop()
+            state[name] = 2
+            order.append(name)
+        
+        for name in agents:
+            visit(name, [])
+        order.reverse()
+        
+        rank = {name: i for i, name in enumerate(order)}
+        reachable: Dict[str, Tuple[str, ...]] = {}
+        for name in reversed(order):
+            found = set(agents[name].can_handoff_to)
+            for target in agents[name].can_handoff_to:
+                found.update(reachable[target])
+            reachable[name] = tuple(sorted(found, key=rank.__getitem__))
+        
+        self._handoff_rank = rank
+        self._handoff_topo = reachable
+    
+    async def shutdown(self):
+        """Release MCP mesh connections"""
+        await self.mcp_mesh.aclose()
+    
     async def process(
         self,
         alert: str,
@@ -198,57 +450,93 @@ class AegisSwarm:
         2. Execute agent with MCP tools
         3. Handle handoffs dynamically
         4. Track costs in real-time
+        
+        The swarm runs as a task feeding a bounded queue, so agents keep
+        working while a slow consumer drains events.
         """
         if not self._initialized:
             await self.initialize()
         
+        queue: asyncio.Queue = asyncio.Queue(maxsize=EVENT_BUFFER_SIZE)
+        
+        async def _run():
+            try:
+                async for event in self._process(alert, image_url, starting_agent):
+                    await queue.put(event)
+            except Exception as e:
+                await queue.put(_StreamEnd(e))
+            else:
+                await queue.put(_StreamEnd())
+        
+        producer = asyncio.create_task(_run())
+        try:
+            while True:
+                item = await queue.get()
+                if isinstance(item, _StreamEnd):
+                    if item.error is not None:
+                        raise item.error
+                    break
+                yield item
+        finally:
+            if not producer.done():
+                producer.cancel()
+    
+    async def _process(
+        self,
+        alert: str,
+        image_url: Optional[str],
+        starting_agent: Optional[str]
+    ) -> AsyncIterator[SwarmEvent]:
+        """Run one alert through the agent chain, yielding events"""
+        tier = classify_alert_tier(alert) if self.config.enable_tier_routing else "standard"
         current_agent_name = starting_agent or self.config.default_starting_agent
         context = {"alert": alert, "image_url": image_url}
         
-        visited_agents = set()
+        # Hot-loop lookups bound once
+        agents = self.agents
+        now_ns = time.time_ns
+        agents_used: List[str] = []
         
-        while current_agent_name and current_agent_name not in visited_agents:
-            visited_agents.add(current_agent_name)
-            agent_spec = self.agents.get(current_agent_name)
-            
-            if not agent_spec:
-                yield SwarmEvent(
-                    timestamp=datetime.now(),
-                    event_type="error",
-                    agent=current_agent_name,
-                    data={"error": f"Unknown agent: {current_agent_name}"}
-                )
-                break
+        if current_agent_name not in self._handoff_topo:
+            yield ErrorEvent(
+                timestamp=now_ns(),
+                agent=current_agent_name,
+                error=f"Unknown agent: {current_agent_name}"
+            )
+            current_agent_name = None
+        
+        # The graph is a validated DAG and handoffs follow its edges, so the
+        # walk visits each agent at most once and ends within this many steps
+        steps = len(self._handoff_topo.get(current_agent_name, ())) + 1
+        
+        while current_agent_name and steps:
+            steps -= 1
+            now = now_ns()
+            agent_spec = agents[current_agent_name]
+            agents_used.append(current_agent_name)
             
             # === 1. Select optimal model for this agent ===
-            yield SwarmEvent(
-                timestamp=datetime.now(),
-                event_type="agent_start",
+            yield AgentStartEvent(
+                timestamp=now,
                 agent=current_agent_name,
-                data={"role": agent_spec.role.value}
+                role=agent_spec.role.value
             )
             
             try:
-                model_key, model_profile = await self.model_router.select_model(
-                    agent_spec.task_requirements
-                )
+                model_key, model_profile = await self._select_agent_model(agent_spec, tier)
                 
-                yield SwarmEvent(
-                    timestamp=datetime.now(),
-                    event_type="model_selected",
+                yield ModelSelectedEvent(
+                    timestamp=now,
                     agent=current_agent_name,
-                    data={
-                        "model": model_profile.display_name,
-                        "provider": model_profile.provider,
-                        "reason": self._explain_model_selection(agent_spec, model_profile)
-                    }
+                    model=model_profile.display_name,
+                    provider=model_profile.provider,
+                    reason=self._explain_model_selection(agent_spec, model_profile)
                 )
             except ValueError as e:
-                yield SwarmEvent(
-                    timestamp=datetime.now(),
-                    event_type="error",
+                yield ErrorEvent(
+                    timestamp=now,
                     agent=current_agent_name,
-                    data={"error": str(e)}
+                    error=str(e)
                 )
                 break
             
@@ -256,24 +544,23 @@ class AegisSwarm:
             tools = self._get_agent_tools(agent_spec)
             
             if tools:
-                yield SwarmEvent(
-                    timestamp=datetime.now(),
-                    event_type="tools_available",
+                yield ToolsAvailableEvent(
+                    timestamp=now,
                     agent=current_agent_name,
-                    data={"tools": [t["function"]["name"] for t in tools]}
+                    tools=tuple(t["function"]["name"] for t in tools)
                 )
             
             # === 3. Execute agent (simulated for demo) ===
             # In production, this would call the actual LLM
-            handoff_to = None
-            
-            async for event in self._simulate_agent_execution(
+            events = await self._simulate_agent_execution(
                 agent_spec, model_profile, context, tools
-            ):
+            )
+            handoff_to = next(
+                (event.target for event in reversed(events) if isinstance(event, HandoffEvent)),
+                None
+            )
+            for event in events:
                 yield event
-                
-                if event.event_type == "handoff":
-                    handoff_to = event.data.get("target")
             
             # === 4. Record costs ===
             # Simulated token counts
@@ -284,33 +571,253 @@ class AegisSwarm:
                 success=True
             )
             
-            yield SwarmEvent(
-                timestamp=datetime.now(),
-                event_type="agent_complete",
+            yield AgentCompleteEvent(
+                timestamp=now_ns(),
                 agent=current_agent_name,
-                data={
-                    "model_used": model_profile.display_name,
-                    "budget_remaining": self.model_router.get_budget_status()["remaining"]
-                }
+                model_used=model_profile.display_name,
+                budget_remaining=self.model_router.get_budget_status()["remaining"]
             )
             
             # === 5. Handle handoff ===
+            if handoff_to and handoff_to not in agent_spec.can_handoff_to:
+                yield ErrorEvent(
+                    timestamp=now_ns(),
+                    agent=current_agent_name,
+                    error=f"Undeclared handoff to {handoff_to}"
+                )
+                handoff_to = None
             current_agent_name = handoff_to
         
         # Final summary
-        yield SwarmEvent(
-            timestamp=datetime.now(),
-            event_type="swarm_complete",
+        yield SwarmCompleteEvent(
+            timestamp=now_ns(),
+            agent="coordinator",
+            agents_used=tuple(agents_used),
+            total_cost=self.model_router.spent_today,
+            mesh_status=self.mcp_mesh.get_mesh_status()
+        )
+    
+    async def process_batch(
+        self,
+        alerts: List[str],
+        image_urls: Optional[List[Optional[str]]] = None,
+        starting_agent: Optional[str] = None
+    ) -> AsyncIterator[SwarmEvent]:
+        """
+        Process a burst of alerts, sharing each agent's LLM call across them.
+        
+        Alerts are grouped by tier, then row_marshal_batch_size at a time, so
+        each group's calls go to the model its tier selects. Every agent turn
+        sends its group as one numbered JSON array prompt and splits the
+        structured reply back per alert, instead of one model call per alert.
+        Tool dispatches stay per alert. Events about a single alert carry its
+        index in `alerts` as event.row.
+        """
+        if not self._initialized:
+            await self.initialize()
+        
+        image_urls = image_urls or [None] * len(alerts)
+        rows = [
+            {"alert": alert, "image_url": image_url, "row": i}
+            for i, (alert, image_url) in enumerate(zip(alerts, image_urls))
+        ]
+        size = max(1, self.config.row_marshal_batch_size)
+        first_agent = starting_agent or self.config.default_starting_agent
+        
+        # Tier -> its alerts, in order of first appearance
+        by_tier: Dict[str, List[Dict[str, Any]]] = {}
+        for ctx in rows:
+            tier = classify_alert_tier(ctx["alert"]) if self.config.enable_tier_routing else "standard"
+            by_tier.setdefault(tier, []).append(ctx)
+        
+        for tier, tier_rows in by_tier.items():
+            for start in range(0, len(tier_rows), size):
+                async for event in self._process_rows(tier_rows[start:start + size], first_agent, tier):
+                    yield event
+    
+    async def _process_rows(
+        self,
+        rows: List[Dict[str, Any]],
+        first_agent: str,
+        tier: str = "standard"
+    ) -> AsyncIterator[SwarmEvent]:
+        """Walk one group of same-tier alerts through the agents, one marshaled call per agent turn"""
+        # Agent -> alerts waiting for it; alerts fan out as their handoffs differ
+        queued: Dict[str, List[Dict[str, Any]]] = {first_agent: rows}
+        agents_used: List[str] = []
+        rank = self._handoff_rank
+        now_ns = time.time_ns
+        
+        while queued:
+            # Run queued agents in topological order, so alerts converging on
+            # one agent share its call and no agent is reached twice
+            agent_name = min(queued, key=lambda name: rank.get(name, -1))
+            group = queued.pop(agent_name)
+            
+            agent_spec = self.agents.get(agent_name) if agent_name in rank else None
+            if not agent_spec:
+                yield ErrorEvent(
+                    timestamp=now_ns(),
+                    agent=agent_name,
+                    error=f"Unknown agent: {agent_name}",
+                    rows=tuple(ctx["row"] for ctx in group)
+                )
+                continue
+            if agent_name not in agents_used:
+                agents_used.append(agent_name)
+            
+            yield AgentStartEvent(
+                timestamp=now_ns(),
+                agent=agent_name,
+                role=agent_spec.role.value,
+                rows=tuple(ctx["row"] for ctx in group)
+            )
+            
+            try:
+                model_key, model_profile = await self._select_agent_model(agent_spec, tier)
+            except ValueError as e:
+                yield ErrorEvent(
+                    timestamp=now_ns(),
+                    agent=agent_name,
+                    error=str(e),
+                    rows=tuple(ctx["row"] for ctx in group)
+                )
+                continue
+            
+            yield ModelSelectedEvent(
+                timestamp=now_ns(),
+                agent=agent_name,
+                model=model_profile.display_name,
+                provider=model_profile.provider,
+                reason=self._explain_model_selection(agent_spec, model_profile)
+            )
+            
+            tools = self._get_agent_tools(agent_spec)
+            
+            # One shared call when the marshaled prompt fits, otherwise one per alert
+            prompt = self._marshal_rows(group)
+            if len(prompt) // CHARS_PER_TOKEN <= MARSHAL_PROMPT_TOKEN_BUDGET:
+                calls = [(group, prompt)]
+            else:
+                calls = [([ctx], self._marshal_rows([ctx])) for ctx in group]
+            
+            for call_rows, call_prompt in calls:
+                by_row = {ctx["row"]: ctx for ctx in call_rows}
+                events = await self._simulate_agent_execution(
+                    agent_spec, model_profile, call_rows, tools
+                )
+                for event in events:
+                    yield event
+                    
+                    if isinstance(event, HandoffEvent):
+                        target = event.target
+                        if target not in agent_spec.can_handoff_to:
+                            yield ErrorEvent(
+                                timestamp=now_ns(),
+                                agent=agent_name,
+                                error=f"Undeclared handoff to {target}",
+                                row=event.row
+                            )
+                            continue
+                        queued.setdefault(target, []).append(by_row[event.row])
+                
+                # Simulated token counts: the shared prompt plus a short answer per alert
+                await self.model_router.record_usage(
+                    model_key,
+                    input_tokens=500 + len(call_prompt) // CHARS_PER_TOKEN,
+                    output_tokens=200 * len(call_rows),
+                    success=True
+                )
+            
+            yield AgentCompleteEvent(
+                timestamp=now_ns(),
+                agent=agent_name,
+                model_used=model_profile.display_name,
+                budget_remaining=self.model_router.get_budget_status()["remaining"],
+                rows=tuple(ctx["row"] for ctx in group)
+            )
+        
+        yield SwarmCompleteEvent(
+            timestamp=now_ns(),
             agent="coordinator",
-            data={
-                "agents_used": list(visited_agents),
-                "total_cost": self.model_router.spent_today,
-                "mesh_status": self.mcp_mesh.get_mesh_status()
-            }
+            agents_used=tuple(agents_used),
+            rows=tuple(ctx["row"] for ctx in rows),
+            total_cost=self.model_router.spent_today,
+            mesh_status=self.mcp_mesh.get_mesh_status()
+        )
+    
+    @staticmethod
+    def _marshal_rows(rows: List[Dict[str, Any]]) -> str:
+        """Format a group of alerts as one numbered JSON array prompt"""
+        payload = [
+            {"row": ctx["row"], "alert": ctx["alert"], "has_image": bool(ctx.get("image_url"))}
+            for ctx in rows
+        ]
+        return (
+            f"Handle the following {len(rows)} alerts independently. Reply with a JSON array "
+            f"holding one object per alert, each with its \"row\" number:\n"
+            + orjson.dumps(payload).decode()
         )
     
+    @staticmethod
+    def _demarshal_rows(output: str, rows: List[Dict[str, Any]]) -> Dict[int, Any]:
+        """Split a marshaled reply back into per-alert answers keyed by row"""
+        wanted = {ctx["row"] for ctx in rows}
+        try:
+            items = orjson.loads(output)
+        except orjson.JSONDecodeError:
+            return {}
+        if not isinstance(items, list):
+            return {}
+        return {
+            item["row"]: item
+            for item in items
+            if isinstance(item, dict) and item.get("row") in wanted
+        }
+    
+    async def _select_agent_model(
+        self,
+        agent_spec: AgentSpec,
+        tier: str = "standard"
+    ) -> Tuple[str, ModelProfile]:
+        """Model for an agent, re-selected only after budget drift or a routing change"""
+        router = self.model_router
+        remaining = router.daily_budget - router.spent_today
+        if (
+            router.routing_version != self._model_cache_routing
+            or abs(self._model_cache_remaining - remaining) > MODEL_CACHE_BUDGET_DRIFT * self._model_cache_remaining
+            or (remaining < 1.0) != (self._model_cache_remaining < 1.0)
+        ):
+            self._model_cache.clear()
+            self._model_cache_generation += 1
+            self._model_cache_remaining = remaining
+            self._model_cache_routing = router.routing_version
+        
+        cache_key = (agent_spec.name, tier)
+        cached = self._model_cache.get(cache_key)
+        if cached is not None and cached[1].is_available:
+            return cached
+        
+        requirements = agent_spec.task_requirements
+        if tier in _TIER_PRIORITY:
+            requirements = replace(requirements, priority=_TIER_PRIORITY[tier])
+        selection = await router.select_model(requirements)
+        self._model_cache[cache_key] = selection
+        return selection
+    
     def _get_agent_tools(self, agent_spec: AgentSpec) -> List[Dict]:
-        """Get MCP tools available to an agent based on its server types"""
+        """Get MCP tools available to an agent, rebuilt only after the mesh changes"""
+        if self._tool_cache_version != self.mcp_mesh.topology_version:
+            self._tool_cache.clear()
+            self._tool_cache_version = self.mcp_mesh.topology_version
+        
+        tools = self._tool_cache.get(agent_spec.name)
+        if tools is None:
+            tools = self._tool_cache[agent_spec.name] = self._build_agent_tools(agent_spec)
+        return tools
+    
+    def _build_agent_tools(self, agent_spec: AgentSpec) -> List[Dict]:
+        """Build the LLM tool schemas for an agent's MCP server types"""
         all_tools = []
         
         for server_type in agent_spec.mcp_server_types:
@@ -321,11 +828,7 @@ class AegisSwarm:
                     "function": {
                         "name": f"{tool.server_id}__{tool.name}",
                         "description": tool.description,
-                        "parameters": {
-                            "type": "object",
-                            "properties": {k: {"type": v} for k, v in tool.parameters.items()},
-                            "required": list(tool.parameters.keys())
-                        }
+                        "parameters": tool._llm_schema  # Built once per tool by the mesh
                     }
                 })
         
@@ -335,14 +838,11 @@ class AegisSwarm:
         """Explain why a model was selected"""
         reasons = []
         
-        if agent.role == AgentRole.TRIAGE:
-            reasons.append("Fast triage requires low latency")
-        elif agent.role == AgentRole.VISION:
-            reasons.append("Image analysis requires vision capability")
-        elif agent.role == AgentRole.ANALYST:
-            reasons.append("Complex reasoning with tool use required")
+        role_reason = _ROLE_REASONS.get(agent.role)
+        if role_reason:
+            reasons.append(role_reason)
         
-        if ModelCapability.COST in model.capabilities:
+        if model.capabilities & _COST_CAPABILITY:
             reasons.append("Budget-optimized selection")
         
         return "; ".join(reasons)
@@ -351,61 +851,99 @@ class AegisSwarm:
         self,
         agent: AgentSpec,
         model,
-        context: Dict,
+        context: Union[Dict, List[Dict]],
         tools: List[Dict]
-    ) -> AsyncIterator[SwarmEvent]:
-        """Simulate agent execution (replace with real LLM calls in production)"""
+    ) -> List[SwarmEvent]:
+        """
+        Simulate agent execution (replace with real LLM calls in production).
         
-        await asyncio.sleep(0.3)  # Simulate latency
+        A list of row contexts from process_batch shares one marshaled model
+        call; its per-alert events are tagged with their row.
         
-        # Simulate tool calls for analyst
-        if agent.role == AgentRole.ANALYST and tools:
-            for tool in tools[:3]:  # Call first 3 tools
-                tool_name = tool["function"]["name"]
-                
-                yield SwarmEvent(
-                    timestamp=datetime.now(),
-                    event_type="tool_call",
-                    agent=agent.name,
-                    data={"tool": tool_name, "status": "executing"}
-                )
-                
-                await asyncio.sleep(0.5)  # Simulate tool execution
-                
-                yield SwarmEvent(
-                    timestamp=datetime.now(),
-                    event_type="tool_result",
-                    agent=agent.name,
-                    data={"tool": tool_name, "status": "completed"}
-                )
+        The simulated turn is short, so its events come back as one list
+        rather than through an async generator.
+        """
+        batched = isinstance(context, list)
+        rows = context if batched else [context]
+        latency = self.config.simulate_latency_s
+        events: List[SwarmEvent] = []
+        append = events.append
+        now_ns = time.time_ns
+        role = agent.role
+        name = agent.name
+        analyst_tools = tools[:3] if role is AgentRole.ANALYST else ()  # Call first 3 tools
         
-        # Simulate response
-        yield SwarmEvent(
-            timestamp=datetime.now(),
-            event_type="response",
-            agent=agent.name,
-            data={"content": f"[{model.display_name}] Analysis complete for {context.get('alert', 'alert')[:50]}..."}
-        )
+        if latency > 0:
+            await asyncio.sleep(latency)  # Simulate model latency
+        
+        # The shared call answers every row at once; split the reply per alert
+        if batched:
+            reply = orjson.dumps([
+                {"row": ctx["row"], "content": f"[{model.display_name}] Analysis complete for {ctx['alert'][:50]}..."}
+                for ctx in rows
+            ]).decode()
+            answers = self._demarshal_rows(reply, rows)
         
-        # Simulate handoff decision
-        if agent.can_handoff_to:
-            has_image = bool(context.get("image_url"))
+        for ctx in rows:
+            row = ctx["row"] if batched else None
             
-            if agent.role == AgentRole.TRIAGE:
-                target = "vision_specialist" if has_image else "climate_analyst"
-                yield SwarmEvent(
-                    timestamp=datetime.now(),
-                    event_type="handoff",
-                    agent=agent.name,
-                    data={"target": target, "reason": "Routing based on input type"}
-                )
-            elif agent.role == AgentRole.VISION:
-                yield SwarmEvent(
-                    timestamp=datetime.now(),
-                    event_type="handoff",
-                    agent=agent.name,
-                    data={"target": "climate_analyst", "reason": "Vision analysis complete, proceeding to logistics"}
-                )
+            # Simulate tool calls for analyst
+            if analyst_tools:
+                for tool in analyst_tools:
+                    tool_name = tool["function"]["name"]
+                    
+                    append(ToolCallEvent(
+                        timestamp=now_ns(),
+                        agent=name,
+                        tool=tool_name,
+                        row=row
+                    ))
+                    
+                    if latency > 0:
+                        await asyncio.sleep(latency)  # Simulate tool execution
+                    
+                    append(ToolResultEvent(
+                        timestamp=now_ns(),
+                        agent=name,
+                        tool=tool_name,
+                        row=row
+                    ))
+            
+            # Simulate response
+            if batched:
+                content = answers.get(ctx["row"], {}).get("content", "")
+            else:
+                content = f"[{model.display_name}] Analysis complete for {ctx.get('alert', 'alert')[:50]}..."
+            append(ResponseEvent(
+                timestamp=now_ns(),
+                agent=name,
+                content=content,
+                row=row
+            ))
+            
+            # Simulate handoff decision
+            if agent.can_handoff_to:
+                has_image = bool(ctx.get("image_url"))
+                
+                if role is AgentRole.TRIAGE:
+                    target = "vision_specialist" if has_image else "climate_analyst"
+                    append(HandoffEvent(
+                        timestamp=now_ns(),
+                        agent=name,
+                        target=target,
+                        reason="Routing based on input type",
+                        row=row
+                    ))
+                elif role is AgentRole.VISION:
+                    append(HandoffEvent(
+                        timestamp=now_ns(),
+                        agent=name,
+                        target="climate_analyst",
+                        reason="Vision analysis complete, proceeding to logistics",
+                        row=row
+                    ))
+        
+        return events
     
     def get_status(self) -> Dict[str, Any]:
         """Get complete swarm status"""
@@ -417,7 +955,7 @@ class AegisSwarm:
                 {
                     "name": spec.name,
                     "role": spec.role.value,
-                    "can_handoff_to": spec.can_handoff_to,
+                    "can_handoff_to": list(spec.can_handoff_to),
                     "tools": len(self._get_agent_tools(spec)),
                 }
                 for spec in self.agents.values()
@@ -436,6 +974,7 @@ async def demo():
     swarm = AegisSwarm(SwarmConfig(
         daily_budget_usd=5.0,
         enable_cost_optimization=True,
+        simulate_latency_s=0.4,
     ))
     
     await swarm.initialize()
@@ -453,26 +992,29 @@ async def demo():
         alert="CRITICAL: Flood detected in Jakarta, Indonesia. 500,000 people affected. Severity CRITICAL.",
         stream=True
     ):
-        if event.event_type == "agent_start":
-            print(f"\n▶ [{event.agent.upper()}] Starting...")
-        elif event.event_type == "model_selected":
-            print(f"   🧠 Model: {event.data['model']} ({event.data['provider']})")
-            print(f"   💡 Reason: {event.data['reason']}")
-        elif event.event_type == "tool_call":
-            print(f"   🔧 Calling: {event.data['tool']}")
-        elif event.event_type == "tool_result":
-            print(f"   ✓ {event.data['tool']} completed")
-        elif event.event_type == "handoff":
-            print(f"   ➤ HANDOFF to {event.data['target'].upper()}: {event.data['reason']}")
-        elif event.event_type == "response":
-            print(f"   📝 {event.data['content'][:80]}...")
-        elif event.event_type == "agent_complete":
-            print(f"   💰 Budget remaining: ${event.data['budget_remaining']:.2f}")
-        elif event.event_type == "swarm_complete":
-            print(f"\n{'=' * 70}")
-            print(f"✅ SWARM COMPLETE")
-            print(f"   Agents used: {', '.join(event.data['agents_used'])}")
-            print(f"   Total cost: ${event.data['total_cost']:.4f}")
+        match event:
+            case AgentStartEvent():
+                print(f"\n▶ [{event.agent.upper()}] Starting... ({event.as_datetime():%H:%M:%S})")
+            case ModelSelectedEvent(model=model, provider=provider, reason=reason):
+                print(f"   🧠 Model: {model} ({provider})")
+                print(f"   💡 Reason: {reason}")
+            case ToolCallEvent(tool=tool):
+                print(f"   🔧 Calling: {tool}")
+            case ToolResultEvent(tool=tool):
+                print(f"   ✓ {tool} completed")
+            case HandoffEvent(target=target, reason=reason):
+                print(f"   ➤ HANDOFF to {target.upper()}: {reason}")
+            case ResponseEvent(content=content):
+                print(f"   📝 {content[:80]}...")
+            case AgentCompleteEvent(budget_remaining=budget_remaining):
+                print(f"   💰 Budget remaining: ${budget_remaining:.2f}")
+            case SwarmCompleteEvent(agents_used=agents_used, total_cost=total_cost):
+                print(f"\n{'=' * 70}")
+                print(f"✅ SWARM COMPLETE")
+                print(f"   Agents used: {', '.join(agents_used)}")
+                print(f"   Total cost: ${total_cost:.4f}")
+    
+    await swarm.shutdown()
 
 
 if __name__ == "__main__":
@@ -4,7 +4,8 @@ All values read from environment variables - no hardcoding
 """
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import List, Optional
 
 
@@ -26,10 +27,16 @@ class GestureConfig:
     port: int = int(os.getenv("GESTURE_WS_PORT", "8765"))
 
 
+def _external_mcp_servers() -> List[str]:
+    """Comma-separated EXTERNAL_MCP_SERVERS as a list"""
+    mcp_servers_env = os.getenv("EXTERNAL_MCP_SERVERS", "")
+    return [s.strip() for s in mcp_servers_env.split(",") if s.strip()]
+
+
 @dataclass
 class ExternalServicesConfig:
     """External MCP servers and APIs"""
-    external_mcp_servers: List[str] = None
+    external_mcp_servers: List[str] = field(default_factory=_external_mcp_servers)
     
     # LLM API Keys
     anthropic_api_key: Optional[str] = os.getenv("ANTHROPIC_API_KEY")
@@ -39,32 +46,25 @@ class ExternalServicesConfig:
     # Optional services
     elevenlabs_api_key: Optional[str] = os.getenv("ELEVENLABS_API_KEY")
     featherless_api_key: Optional[str] = os.getenv("FEATHERLESS_API_KEY")
-    
-    def __post_init__(self):
-        mcp_servers_env = os.getenv("EXTERNAL_MCP_SERVERS", "")
-        self.external_mcp_servers = [
-            s.strip() for s in mcp_servers_env.split(",") if s.strip()
-        ]
 
 
 @dataclass 
 class Config:
     """Main configuration container"""
-    server: ServerConfig = None
-    gesture: GestureConfig = None
-    external: ExternalServicesConfig = None
-    
-    def __post_init__(self):
-        self.server = ServerConfig()
-        self.gesture = GestureConfig()
-        self.external = ExternalServicesConfig()
+    server: ServerConfig = field(default_factory=ServerConfig)
+    gesture: GestureConfig = field(default_factory=GestureConfig)
+    external: ExternalServicesConfig = field(default_factory=ExternalServicesConfig)
 
 
-# Global config instance
-config = Config()
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Get the global configuration, built on first use"""
+    return Config()
 
 
-def get_config() -> Config:
-    """Get the global configuration"""
-    return config
+def __getattr__(name: str):
+    # `config` stays importable as the global instance, created lazily
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
@@ -4,8 +4,13 @@ Agent implementation for Dedalus Labs
 
 import asyncio
 import logging
+import time
 import uuid
-from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import orjson
 
 from .types import (
     AgentConfig, 
@@ -22,6 +27,23 @@ from .mcp_client import MCPClientPool
 
 logger = logging.getLogger(__name__)
 
+# Results of idempotent tool calls kept per agent, least recently used evicted
+TOOL_RESULT_CACHE_SIZE = 256
+
+# Seconds a cached result is served; agents live for the whole process and
+# idempotent tools may still stamp their results with the current time
+TOOL_RESULT_CACHE_TTL = 60.0
+
+
+def _stringify_content(content: Any) -> str:
+    """Tool output as message text: strings as-is, structured data as JSON"""
+    if isinstance(content, str):
+        return content
+    try:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS).decode()
+    except TypeError:
+        return str(content)
+
 
 class Agent:
     """
@@ -34,26 +56,40 @@ class Agent:
     - Stream their reasoning process
     """
     
-    def __init__(self, config: AgentConfig):
+    def __init__(
+        self,
+        config: AgentConfig,
+        http_client: Optional[httpx.AsyncClient] = None,
+        mcp_pool: Optional[MCPClientPool] = None
+    ):
         self.config = config
         self.name = config.name
         self.model = config.model
         self.system_prompt = config.system_prompt
-        self.mcp_pool = MCPClientPool()
+        # Agents in one swarm share a pool, so each server is connected and discovered once
+        self.mcp_pool = mcp_pool if mcp_pool is not None else MCPClientPool(http_client=http_client)
         self._handoff_registry: Dict[str, "Agent"] = {}
+        self._system_prompt_cached: Optional[str] = None
+        # Pool tool list the cached tools were built from, and the result
+        self._tools_source: Optional[List[Dict[str, Any]]] = None
+        self._tools_cached: Optional[List[Dict[str, Any]]] = None
+        # (tool name, canonical JSON arguments) -> (monotonic time stored, successful result)
+        self._tool_result_cache: "OrderedDict[Tuple[str, bytes], Tuple[float, ToolResult]]" = OrderedDict()
     
     def register_handoff(self, agent: "Agent"):
         """Register an agent for potential handoffs"""
         self._handoff_registry[agent.name] = agent
+        self._system_prompt_cached = None
+        self._tools_cached = None
     
     async def initialize_mcp(self, server_urls: List[str]):
         """Initialize connections to MCP servers"""
-        for url in server_urls:
-            await self.mcp_pool.add_server(url)
-        
-        # Also add servers from config
-        for url in self.config.mcp_servers:
-            await self.mcp_pool.add_server(url)
+        # Servers from config too; a shared pool may already hold some of them
+        await asyncio.gather(*(
+            self.mcp_pool.add_server(url)
+            for url in dict.fromkeys([*server_urls, *self.config.mcp_servers])
+            if url not in self.mcp_pool.clients
+        ))
     
     async def run(
         self,
@@ -103,35 +139,36 @@ class Agent:
                     final_content = content
                     break
                 
-                # Process tool calls
-                for tool_call in tool_calls:
-                    all_tool_calls.append(tool_call)
-                    
-                    # Check for handoff
-                    if tool_call.name == "handoff":
-                        target_agent = tool_call.arguments.get("agent_name")
-                        if target_agent in self._handoff_registry:
-                            handoff_to = target_agent
-                            final_content = content
-                            break
-                    
-                    # Execute tool
-                    result = await self._execute_tool(tool_call)
-                    all_tool_results.append(result)
-                    
-                    # Add tool result to messages
+                # A handoff ends the turn: calls before it still run, later ones are dropped
+                for index, tool_call in enumerate(tool_calls):
+                    if (
+                        tool_call.name == "handoff"
+                        and tool_call.arguments.get("agent_name") in self._handoff_registry
+                    ):
+                        handoff_to = tool_call.arguments.get("agent_name")
+                        all_tool_calls.extend(tool_calls[:index + 1])
+                        tool_calls = tool_calls[:index]
+                        break
+                else:
+                    all_tool_calls.extend(tool_calls)
+                
+                if tool_calls:
+                    # Calls from one response are independent, so run them concurrently.
+                    # Each result is turned into its tool message as soon as it lands,
+                    # so the next chat request is ready the moment the slowest tool returns
+                    exchanges = await asyncio.gather(
+                        *(self._run_tool_call(tool_call) for tool_call in tool_calls)
+                    )
+                    all_tool_results.extend(result for result, _ in exchanges)
                     full_messages.append(Message(
                         role=MessageRole.ASSISTANT,
                         content=content,
-                        tool_calls=[tool_call]
-                    ))
-                    full_messages.append(Message(
-                        role=MessageRole.TOOL,
-                        content=str(result.content),
-                        tool_call_id=tool_call.id
+                        tool_calls=tool_calls
                     ))
+                    full_messages.extend(message for _, message in exchanges)
                 
                 if handoff_to:
+                    final_content = content
                     break
                     
             except Exception as e:
@@ -211,6 +248,10 @@ class Agent:
     
     def _build_system_prompt(self) -> str:
         """Build the full system prompt including handoff instructions"""
+        # Only register_handoff changes the prompt, and it clears the cache
+        if self._system_prompt_cached is not None:
+            return self._system_prompt_cached
+        
         prompt = self.system_prompt
         
         if self._handoff_registry:
@@ -220,15 +261,20 @@ class Agent:
                 prompt += f"- **{name}**: {agent.config.metadata.get('description', 'Specialized agent')}\n"
             prompt += "\nUse the 'handoff' tool to transfer the conversation when appropriate."
         
+        self._system_prompt_cached = prompt
         return prompt
     
     def _get_available_tools(self) -> List[Dict[str, Any]]:
         """Get all available tools including MCP tools and handoff"""
         tools = self.mcp_pool.get_all_tools()
+        # Same list object back means the same tool set, so LLM clients can reuse conversions
+        if self._tools_cached is not None and self._tools_source is tools:
+            return self._tools_cached
+        self._tools_source = tools
         
-        # Add handoff tool if we have registered agents
+        # Add handoff tool if we have registered agents; the pool's list is shared, so copy
         if self._handoff_registry:
-            tools.append({
+            tools = tools + [{
                 "type": "function",
                 "function": {
                     "name": "handoff",
@@ -249,12 +295,50 @@ class Agent:
                         "required": ["agent_name"]
                     }
                 }
-            })
+            }]
         
+        self._tools_cached = tools
         return tools
     
+    async def _run_tool_call(self, tool_call: ToolCall) -> Tuple[ToolResult, Message]:
+        """Execute a tool call and build the tool message for its result"""
+        result = await self._execute_tool(tool_call)
+        return result, Message(
+            role=MessageRole.TOOL,
+            content=_stringify_content(result.content),
+            tool_call_id=tool_call.id
+        )
+    
     async def _execute_tool(self, tool_call: ToolCall) -> ToolResult:
-        """Execute a tool call"""
+        """Execute a tool call, answering repeated idempotent calls from cache"""
+        cache_key = None
+        if self.mcp_pool.is_idempotent(tool_call.name):
+            try:
+                cache_key = (tool_call.name, orjson.dumps(
+                    tool_call.arguments, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+                ))
+            except TypeError:
+                cache_key = None  # Arguments that can't be keyed are never cached
+        
+        if cache_key is not None:
+            cached = self._tool_result_cache.get(cache_key)
+            if cached is not None:
+                stored_at, cached_result = cached
+                if time.monotonic() - stored_at < TOOL_RESULT_CACHE_TTL:
+                    self._tool_result_cache.move_to_end(cache_key)
+                    return cached_result.model_copy(update={"tool_call_id": tool_call.id})
+                del self._tool_result_cache[cache_key]
+        
+        result = await self._call_tool(tool_call)
+        
+        if cache_key is not None and not result.is_error:
+            self._tool_result_cache[cache_key] = (time.monotonic(), result)
+            if len(self._tool_result_cache) > TOOL_RESULT_CACHE_SIZE:
+                self._tool_result_cache.popitem(last=False)
+        return result
+    
+    async def _call_tool(self, tool_call: ToolCall) -> ToolResult:
+        """Send a tool call to the MCP pool"""
         try:
             result = await self.mcp_pool.call_tool(
                 tool_call.name,
@@ -3,21 +3,129 @@ LLM Client abstraction for multiple providers
 """
 
 import asyncio
-import json
 import os
 import logging
-from typing import Any, AsyncIterator, Dict, List, Optional, Union
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
 from abc import ABC, abstractmethod
 import httpx
+import orjson
 
 from .types import Message, MessageRole, ToolCall, TextContent, ImageContent
+from .streaming import kvitems
 
 logger = logging.getLogger(__name__)
 
+# Pool settings for each provider's long-lived HTTP client
+LLM_TIMEOUT_S = 120.0
+LLM_POOL_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=90)
+
+# Batching, enabled by setting DEDALUS_BATCH_MS to the collection window
+LLM_BATCH_MAX_SIZE = 8
+LLM_BATCH_CONCURRENCY = 8
+
+# In-flight requests allowed per provider client
+MAX_CONCURRENCY = int(os.getenv("DEDALUS_MAX_CONCURRENCY", "16"))
+
+# Converted messages kept per client; history is resent every turn
+MESSAGE_CACHE_SIZE = 512
+
+
+def _anthropic_image(item: ImageContent) -> Optional[Dict[str, Any]]:
+    if item.url:
+        return {"type": "image", "source": {"type": "url", "url": item.url}}
+    if item.base64_data:
+        return {
+            "type": "image",
+            "source": {"type": "base64", "media_type": item.media_type, "data": item.base64_data}
+        }
+    return None
+
+
+def _gemini_image(item: ImageContent) -> Optional[Dict[str, Any]]:
+    if item.url:
+        return {"file_data": {"mime_type": item.media_type, "file_uri": item.url}}
+    if item.base64_data:
+        return {"inline_data": {"mime_type": item.media_type, "data": item.base64_data}}
+    return None
+
+
+# Content part type -> provider format (None means drop the part)
+_ANTHROPIC_CONVERTERS = {
+    TextContent: lambda item: {"type": "text", "text": item.text},
+    ImageContent: _anthropic_image,
+}
+_GEMINI_CONVERTERS = {
+    TextContent: lambda item: {"text": item.text},
+    ImageContent: _gemini_image,
+}
+
+
+def _convert_parts(content: List[Any], converters: Dict[type, Any]) -> List[Dict[str, Any]]:
+    """Convert content parts with a type-keyed dispatch table"""
+    parts = []
+    for item in content:
+        converter = converters.get(type(item))
+        if converter is not None:
+            part = converter(item)
+            if part is not None:
+                parts.append(part)
+    return parts
+
+
+async def _read_fields(response: httpx.Response, keys: frozenset) -> Dict[str, Any]:
+    """Parse a JSON object body as it streams in, keeping only the given top-level keys"""
+    fields = {}
+    async for key, value in kvitems(response.aiter_bytes()):
+        if key in keys:
+            fields[key] = value
+    return fields
+
 
 class LLMClient(ABC):
     """Abstract base class for LLM clients"""
     
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Caps in-flight requests so bursts queue here instead of opening sockets
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        # id(message) -> (message, converted); holding the message keeps the id from being reused
+        self._message_cache: "OrderedDict[int, Tuple[Message, Dict[str, Any]]]" = OrderedDict()
+    
+    def _convert_cached(self, msg: Message, convert) -> Dict[str, Any]:
+        """Convert a message once; earlier turns are resent unchanged"""
+        key = id(msg)
+        cached = self._message_cache.get(key)
+        if cached is not None and cached[0] is msg:
+            self._message_cache.move_to_end(key)
+            return cached[1]
+        converted = convert(msg)
+        self._message_cache[key] = (msg, converted)
+        if len(self._message_cache) > MESSAGE_CACHE_SIZE:
+            self._message_cache.popitem(last=False)
+        return converted
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Keep-alive client for this provider, created on first use"""
+        loop = asyncio.get_running_loop()
+        # Pooled connections belong to the loop that opened them
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            # HTTP/2 multiplexes streams and parallel chats over one TLS session per provider
+            self._client = httpx.AsyncClient(http2=True, timeout=LLM_TIMEOUT_S, limits=LLM_POOL_LIMITS)
+            if self._client_loop is not loop:
+                # So is the semaphore's waiter queue
+                self._semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+            self._client_loop = loop
+        return self._client
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+    
     @abstractmethod
     async def chat(
         self,
@@ -33,9 +141,24 @@ class LLMClient(ABC):
 class AnthropicClient(LLMClient):
     """Client for Anthropic Claude models"""
     
+    # Top-level response fields _parse_response reads
+    _RESPONSE_KEYS = frozenset({"content", "stop_reason", "usage"})
+    # Converted tool lists kept per client
+    _TOOLS_CACHE_SIZE = 32
+    
     def __init__(self, api_key: Optional[str] = None):
+        super().__init__()
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.base_url = "https://api.anthropic.com/v1"
+        # Fixed per client, so build them once instead of on every request
+        self._messages_url = f"{self.base_url}/messages"
+        self._headers = {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json"
+        }
+        # id(tools) -> (tools, converted); holding tools keeps the id from being reused
+        self._tools_cache: Dict[int, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = {}
     
     def _convert_messages(self, messages: List[Message]) -> tuple[Optional[str], List[Dict]]:
         """Convert messages to Anthropic format"""
@@ -47,41 +170,27 @@ class AnthropicClient(LLMClient):
                 system_prompt = msg.content if isinstance(msg.content, str) else str(msg.content)
                 continue
             
-            content = msg.content
-            if isinstance(content, list):
-                anthropic_content = []
-                for item in content:
-                    if isinstance(item, TextContent):
-                        anthropic_content.append({"type": "text", "text": item.text})
-                    elif isinstance(item, ImageContent):
-                        if item.url:
-                            anthropic_content.append({
-                                "type": "image",
-                                "source": {
-                                    "type": "url",
-                                    "url": item.url
-                                }
-                            })
-                        elif item.base64_data:
-                            anthropic_content.append({
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": item.media_type,
-                                    "data": item.base64_data
-                                }
-                            })
-                content = anthropic_content
-            
-            converted.append({
-                "role": "user" if msg.role == MessageRole.USER else "assistant",
-                "content": content
-            })
+            converted.append(self._convert_cached(msg, self._convert_message))
         
         return system_prompt, converted
     
+    @staticmethod
+    def _convert_message(msg: Message) -> Dict[str, Any]:
+        """Convert one non-system message to Anthropic format"""
+        content = msg.content
+        if isinstance(content, list):
+            content = _convert_parts(content, _ANTHROPIC_CONVERTERS)
+        return {
+            "role": "user" if msg.role == MessageRole.USER else "assistant",
+            "content": content
+        }
+    
     def _convert_tools(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Convert tools to Anthropic format"""
+        """Convert tools to Anthropic format, once per tool list"""
+        cached = self._tools_cache.get(id(tools))
+        if cached is not None and cached[0] is tools:
+            return cached[1]
+        
         anthropic_tools = []
         for tool in tools:
             if tool.get("type") == "function":
@@ -91,6 +200,10 @@ class AnthropicClient(LLMClient):
                     "description": func.get("description", ""),
                     "input_schema": func.get("parameters", {"type": "object", "properties": {}})
                 })
+        
+        if len(self._tools_cache) >= self._TOOLS_CACHE_SIZE:
+            self._tools_cache.clear()
+        self._tools_cache[id(tools)] = (tools, anthropic_tools)
         return anthropic_tools
     
     async def chat(
@@ -121,31 +234,29 @@ class AnthropicClient(LLMClient):
         if stream:
             return self._stream_chat(payload)
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{self.base_url}/messages",
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json"
-                },
-                json=payload
-            )
-            
+        client = await self._get_client()
+        async with self._semaphore, client.stream(
+            "POST",
+            self._messages_url,
+            headers=self._headers,
+            content=orjson.dumps(payload)
+        ) as response:
             if response.status_code != 200:
+                await response.aread()
                 logger.error(f"Anthropic API error: {response.text}")
                 raise Exception(f"Anthropic API error: {response.status_code}")
             
-            return self._parse_response(response.json())
+            # Parse while the body streams in, skipping fields we never read
+            return self._parse_response(await _read_fields(response, self._RESPONSE_KEYS))
     
     def _parse_response(self, response: Dict) -> Dict[str, Any]:
         """Parse Anthropic response to common format"""
-        content = ""
+        text_parts = []
         tool_calls = []
         
         for block in response.get("content", []):
             if block["type"] == "text":
-                content += block["text"]
+                text_parts.append(block["text"])
             elif block["type"] == "tool_use":
                 tool_calls.append(ToolCall(
                     id=block["id"],
@@ -154,7 +265,7 @@ class AnthropicClient(LLMClient):
                 ))
         
         return {
-            "content": content,
+            "content": "".join(text_parts),
             "tool_calls": tool_calls,
             "stop_reason": response.get("stop_reason"),
             "usage": response.get("usage", {})
@@ -164,29 +275,33 @@ class AnthropicClient(LLMClient):
         """Stream chat completion"""
         payload["stream"] = True
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/messages",
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json"
-                },
-                json=payload
-            ) as response:
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        data = json.loads(line[6:])
-                        yield data
+        client = await self._get_client()
+        async with self._semaphore, client.stream(
+            "POST",
+            self._messages_url,
+            headers=self._headers,
+            content=orjson.dumps(payload)
+        ) as response:
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    data = orjson.loads(line[6:])
+                    yield data
 
 
 class GoogleClient(LLMClient):
     """Client for Google Gemini models"""
     
+    # Top-level response fields _parse_response reads
+    _RESPONSE_KEYS = frozenset({"candidates", "usageMetadata"})
+    
     def __init__(self, api_key: Optional[str] = None):
+        super().__init__()
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
+        self._headers = {"content-type": "application/json"}
+        self._params = {"key": self.api_key}
+        # (model, stream) -> endpoint URL
+        self._endpoint_cache: Dict[Tuple[str, bool], str] = {}
     
     def _convert_messages(self, messages: List[Message]) -> tuple[Optional[str], List[Dict]]:
         """Convert messages to Gemini format"""
@@ -198,36 +313,23 @@ class GoogleClient(LLMClient):
                 system_prompt = msg.content if isinstance(msg.content, str) else str(msg.content)
                 continue
             
-            parts = []
-            content = msg.content
-            
-            if isinstance(content, str):
-                parts.append({"text": content})
-            elif isinstance(content, list):
-                for item in content:
-                    if isinstance(item, TextContent):
-                        parts.append({"text": item.text})
-                    elif isinstance(item, ImageContent):
-                        if item.url:
-                            parts.append({
-                                "file_data": {
-                                    "mime_type": item.media_type,
-                                    "file_uri": item.url
-                                }
-                            })
-                        elif item.base64_data:
-                            parts.append({
-                                "inline_data": {
-                                    "mime_type": item.media_type,
-                                    "data": item.base64_data
-                                }
-                            })
-            
-            role = "user" if msg.role == MessageRole.USER else "model"
-            converted.append({"role": role, "parts": parts})
+            converted.append(self._convert_cached(msg, self._convert_message))
         
         return system_prompt, converted
     
+    @staticmethod
+    def _convert_message(msg: Message) -> Dict[str, Any]:
+        """Convert one non-system message to Gemini format"""
+        content = msg.content
+        if isinstance(content, str):
+            parts = [{"text": content}]
+        elif isinstance(content, list):
+            parts = _convert_parts(content, _GEMINI_CONVERTERS)
+        else:
+            parts = []
+        role = "user" if msg.role == MessageRole.USER else "model"
+        return {"role": role, "parts": parts}
+    
     async def chat(
         self,
         messages: List[Message],
@@ -251,43 +353,171 @@ class GoogleClient(LLMClient):
         if system_prompt:
             payload["systemInstruction"] = {"parts": [{"text": system_prompt}]}
         
-        endpoint = f"{self.base_url}/models/{model}:generateContent"
-        if stream:
-            endpoint = f"{self.base_url}/models/{model}:streamGenerateContent"
+        endpoint = self._endpoint_cache.get((model, stream))
+        if endpoint is None:
+            method = "streamGenerateContent" if stream else "generateContent"
+            endpoint = self._endpoint_cache[(model, stream)] = f"{self.base_url}/models/{model}:{method}"
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                endpoint,
-                params={"key": self.api_key},
-                headers={"content-type": "application/json"},
-                json=payload
-            )
-            
+        client = await self._get_client()
+        async with self._semaphore, client.stream(
+            "POST",
+            endpoint,
+            params=self._params,
+            headers=self._headers,
+            content=orjson.dumps(payload)
+        ) as response:
             if response.status_code != 200:
+                await response.aread()
                 logger.error(f"Google API error: {response.text}")
                 raise Exception(f"Google API error: {response.status_code}")
             
-            return self._parse_response(response.json())
+            return self._parse_response(await _read_fields(response, self._RESPONSE_KEYS))
     
     def _parse_response(self, response: Dict) -> Dict[str, Any]:
         """Parse Gemini response to common format"""
-        content = ""
+        text_parts = []
         
         candidates = response.get("candidates", [])
         if candidates:
             parts = candidates[0].get("content", {}).get("parts", [])
             for part in parts:
                 if "text" in part:
-                    content += part["text"]
+                    text_parts.append(part["text"])
         
         return {
-            "content": content,
+            "content": "".join(text_parts),
             "tool_calls": [],
             "stop_reason": candidates[0].get("finishReason") if candidates else None,
             "usage": response.get("usageMetadata", {})
         }
 
 
+class RequestBatcher:
+    """
+    Collects concurrent chat requests and dispatches them together.
+    
+    Requests are queued until max_batch_size is reached or batch_window_ms
+    elapses, then sent through the inner client at most max_concurrency at
+    a time across all flushes, so bursts from parallel agents share its
+    pooled connections.
+    
+    Neither Anthropic nor Gemini accepts several prompts in one call, so
+    with the current providers a batch is fanned out as separate requests
+    and enabling DEDALUS_BATCH_MS only adds up to batch_window_ms of latency.
+    """
+    
+    def __init__(
+        self,
+        client: LLMClient,
+        batch_window_ms: float,
+        max_batch_size: int = LLM_BATCH_MAX_SIZE,
+        max_concurrency: int = LLM_BATCH_CONCURRENCY
+    ):
+        self.client = client
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+        # Shared by every flush so overlapping batches stay within max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def submit(self, **kwargs) -> asyncio.Future:
+        """Queue a chat request and return a future for its response"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((kwargs, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.batch_window_ms / 1000, self._schedule_flush)
+        
+        return future
+    
+    def _schedule_flush(self):
+        """Flush from a callback, keeping a reference to the task"""
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def flush(self):
+        """Dispatch all queued requests and resolve their futures"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        # Neither provider takes multiple prompts per call, so fan out
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            # The wrapper is cached across event loops, and a semaphore's waiters belong to one
+            if self._semaphore_loop is not None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        semaphore = self._semaphore
+        
+        async def send(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.client.chat(**kwargs)
+        
+        results = await asyncio.gather(
+            *(send(kwargs) for kwargs, _ in batch),
+            return_exceptions=True
+        )
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class BatchingLLMClient(LLMClient):
+    """Wraps a provider client so concurrent non-streaming chats go through a RequestBatcher"""
+    
+    def __init__(self, client: LLMClient, batch_window_ms: float):
+        super().__init__()
+        self.client = client
+        self.batcher = RequestBatcher(client, batch_window_ms)
+    
+    async def chat(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        stream: bool = False,
+        **kwargs
+    ) -> Union[Dict[str, Any], AsyncIterator[Dict[str, Any]]]:
+        # Streams hold their connection open, so they bypass the batcher
+        if stream:
+            return await self.client.chat(
+                messages, tools=tools, temperature=temperature,
+                max_tokens=max_tokens, stream=True, **kwargs
+            )
+        return await self.batcher.submit(
+            messages=messages, tools=tools, temperature=temperature,
+            max_tokens=max_tokens, **kwargs
+        )
+    
+    async def aclose(self):
+        """Flush queued requests, then close the inner client"""
+        await self.batcher.flush()
+        await self.client.aclose()
+
+
+# Provider name -> shared client, so connection pools outlive a single run
+_clients: Dict[str, LLMClient] = {}
+
+
 def get_llm_client(model: str) -> tuple[LLMClient, str]:
     """
     Get appropriate LLM client based on model string.
@@ -308,9 +538,26 @@ def get_llm_client(model: str) -> tuple[LLMClient, str]:
     provider = provider.lower()
     
     if provider == "anthropic":
-        return AnthropicClient(), model_name
+        client_cls = AnthropicClient
     elif provider in ("google", "gemini"):
-        return GoogleClient(), model_name
+        client_cls = GoogleClient
     else:
         raise ValueError(f"Unsupported provider: {provider}")
+    
+    client = _clients.get(client_cls.__name__)
+    if client is None:
+        client = client_cls()
+        batch_ms = os.getenv("DEDALUS_BATCH_MS")
+        if batch_ms:
+            client = BatchingLLMClient(client, float(batch_ms))
+        _clients[client_cls.__name__] = client
+    return client, model_name
+
+
+async def aclose_llm_clients():
+    """Close every shared provider client's connections"""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
 
@@ -5,11 +5,22 @@ MCP Client for connecting to MCP servers
 import asyncio
 import json
 import logging
+import os
+import time
 from typing import Any, Dict, List, Optional
 import httpx
 
 logger = logging.getLogger(__name__)
 
+# How long a tools/list response stays fresh before it is re-fetched
+TOOLS_CACHE_TTL = 300.0
+
+# Pool settings for a client's own connection when no shared client is given
+MCP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60)
+
+# In-flight requests allowed per server
+MAX_CONCURRENCY = int(os.getenv("DEDALUS_MAX_CONCURRENCY", "16"))
+
 
 class MCPClient:
     """
@@ -18,18 +29,28 @@ class MCPClient:
     Supports both local HTTP servers and remote MCP servers.
     """
     
-    def __init__(self, server_url: str):
+    def __init__(self, server_url: str, http_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize MCP client.
         
         Args:
             server_url: URL of the MCP server (e.g., "http://127.0.0.1:8000/mcp")
                        or a package reference (e.g., "windsornguyen/open-meteo-mcp")
+            http_client: Shared keep-alive client to send requests through.
+                       Without one, the client keeps its own connection.
         """
         self.server_url = self._normalize_url(server_url)
+        self._http_client = http_client
+        self._own_http: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        # Event loop the semaphore and own connection were created on
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self.tools: Dict[str, Any] = {}
+        # LLM-format view of self.tools, rebuilt after each tools/list
+        self._llm_tools: Optional[List[Dict[str, Any]]] = None
         self._initialized = False
         self._request_id = 0
+        self._tools_fetched_at: Optional[float] = None
     
     def _normalize_url(self, url: str) -> str:
         """Normalize server URL"""
@@ -48,33 +69,57 @@ class MCPClient:
         self._request_id += 1
         return self._request_id
     
+    async def _post(self, payload: Dict[str, Any], timeout: float) -> httpx.Response:
+        """POST a JSON-RPC payload over the shared client, or this client's own connection"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # The semaphore's waiter queue and pooled connections belong to
+            # the loop that created them
+            self._semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+            self._own_http = None
+            self._loop = loop
+        client = self._http_client
+        if client is None:
+            if self._own_http is None or self._own_http.is_closed:
+                self._own_http = httpx.AsyncClient(limits=MCP_POOL_LIMITS)
+            client = self._own_http
+        # Bounded so a wide fan-out queues here instead of flooding the server
+        async with self._semaphore:
+            return await client.post(self.server_url, json=payload, timeout=timeout)
+    
+    async def aclose(self):
+        """Close this client's own connection; a shared client belongs to its caller"""
+        if self._own_http is not None:
+            await self._own_http.aclose()
+            self._own_http = None
+            self._loop = None
+    
     async def initialize(self) -> bool:
         """Initialize connection to the MCP server"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.server_url,
-                    json={
-                        "jsonrpc": "2.0",
-                        "id": self._next_id(),
-                        "method": "initialize",
-                        "params": {
-                            "protocolVersion": "2024-11-05",
-                            "clientInfo": {
-                                "name": "dedalus-labs",
-                                "version": "0.1.0"
-                            },
-                            "capabilities": {}
-                        }
+            response = await self._post(
+                {
+                    "jsonrpc": "2.0",
+                    "id": self._next_id(),
+                    "method": "initialize",
+                    "params": {
+                        "protocolVersion": "2024-11-05",
+                        "clientInfo": {
+                            "name": "dedalus-labs",
+                            "version": "0.1.0"
+                        },
+                        "capabilities": {}
                     }
-                )
+                },
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                self._initialized = True
+                # Fetch available tools
+                await self._fetch_tools()
+                return True
                 
-                if response.status_code == 200:
-                    self._initialized = True
-                    # Fetch available tools
-                    await self._fetch_tools()
-                    return True
-                    
         except Exception as e:
             logger.warning(f"Failed to initialize MCP server {self.server_url}: {e}")
             # Try alternative initialization for mock/test scenarios
@@ -85,26 +130,34 @@ class MCPClient:
     async def _fetch_tools(self):
         """Fetch available tools from the server"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.server_url,
-                    json={
-                        "jsonrpc": "2.0",
-                        "id": self._next_id(),
-                        "method": "tools/list",
-                        "params": {}
-                    }
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if "result" in data and "tools" in data["result"]:
-                        for tool in data["result"]["tools"]:
-                            self.tools[tool["name"]] = tool
-                            
+            response = await self._post(
+                {
+                    "jsonrpc": "2.0",
+                    "id": self._next_id(),
+                    "method": "tools/list",
+                    "params": {}
+                },
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                if "result" in data and "tools" in data["result"]:
+                    for tool in data["result"]["tools"]:
+                        self.tools[tool["name"]] = tool
+                self._llm_tools = None
+                self._tools_fetched_at = time.monotonic()
+                        
         except Exception as e:
             logger.warning(f"Failed to fetch tools from {self.server_url}: {e}")
     
+    async def refresh_tools(self, ttl: float = TOOLS_CACHE_TTL) -> bool:
+        """Re-fetch the tool list if the cached one is older than ttl seconds; True if fetched"""
+        if self._tools_fetched_at is not None and time.monotonic() - self._tools_fetched_at < ttl:
+            return False
+        await self._fetch_tools()
+        return True
+    
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """
         Call a tool on the MCP server.
@@ -120,33 +173,38 @@ class MCPClient:
             await self.initialize()
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    self.server_url,
-                    json={
-                        "jsonrpc": "2.0",
-                        "id": self._next_id(),
-                        "method": "tools/call",
-                        "params": {
-                            "name": tool_name,
-                            "arguments": arguments
-                        }
+            response = await self._post(
+                {
+                    "jsonrpc": "2.0",
+                    "id": self._next_id(),
+                    "method": "tools/call",
+                    "params": {
+                        "name": tool_name,
+                        "arguments": arguments
                     }
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if "result" in data:
-                        result = data["result"]
-                        # Extract text content if present
-                        if isinstance(result, dict) and "content" in result:
-                            contents = result["content"]
-                            if isinstance(contents, list) and len(contents) > 0:
-                                return contents[0].get("text", str(result))
-                        return result
-                    elif "error" in data:
-                        raise Exception(data["error"].get("message", "Unknown error"))
-                        
+                },
+                timeout=60.0
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                if "result" in data:
+                    result = data["result"]
+                    # Extract text content if present
+                    if isinstance(result, dict) and "content" in result:
+                        contents = result["content"]
+                        if isinstance(contents, list) and len(contents) > 0:
+                            text = contents[0].get("text", str(result))
+                            # A tool-level failure, reported in-band rather than as a JSON-RPC error
+                            if result.get("isError"):
+                                raise Exception(text)
+                            return text
+                    if isinstance(result, dict) and result.get("isError"):
+                        raise Exception(str(result))
+                    return result
+                elif "error" in data:
+                    raise Exception(data["error"].get("message", "Unknown error"))
+                    
         except httpx.RequestError as e:
             logger.error(f"MCP request failed: {e}")
             raise
@@ -155,6 +213,8 @@ class MCPClient:
     
     def get_tools_for_llm(self) -> List[Dict[str, Any]]:
         """Get tools in LLM-compatible format"""
+        if self._llm_tools is not None:
+            return self._llm_tools
         llm_tools = []
         for name, tool in self.tools.items():
             llm_tools.append({
@@ -165,22 +225,43 @@ class MCPClient:
                     "parameters": tool.get("inputSchema", {"type": "object", "properties": {}})
                 }
             })
+        self._llm_tools = llm_tools
         return llm_tools
 
 
 class MCPClientPool:
     """Pool of MCP clients for multiple servers"""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.clients: Dict[str, MCPClient] = {}
+        self._http_client = http_client
+        # URL -> in-flight add/revalidation, shared by concurrent callers
+        self._init_tasks: Dict[str, asyncio.Task] = {}
+        # Combined tool list, rebuilt after a server is added or refreshed
+        self._all_tools: Optional[List[Dict[str, Any]]] = None
     
     async def add_server(self, server_url: str) -> MCPClient:
-        """Add and initialize an MCP server"""
-        if server_url not in self.clients:
-            client = MCPClient(server_url)
+        """Add and initialize an MCP server, or revalidate a known one"""
+        task = self._init_tasks.get(server_url)
+        if task is None:
+            task = asyncio.ensure_future(self._add_server(server_url))
+            self._init_tasks[server_url] = task
+            task.add_done_callback(lambda _: self._init_tasks.pop(server_url, None))
+        # Shielded so one cancelled caller doesn't cancel the others' handshake
+        return await asyncio.shield(task)
+    
+    async def _add_server(self, server_url: str) -> MCPClient:
+        """Initialize a new server's client or refresh a known one's tools"""
+        client = self.clients.get(server_url)
+        if client is None:
+            client = MCPClient(server_url, http_client=self._http_client)
             await client.initialize()
             self.clients[server_url] = client
-        return self.clients[server_url]
+        elif not await client.refresh_tools():
+            # Tool list still fresh: keep the combined list (and its identity) cached
+            return client
+        self._all_tools = None
+        return client
     
     async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a tool, searching across all connected servers"""
@@ -190,10 +271,26 @@ class MCPClientPool:
         
         raise ValueError(f"Tool not found: {tool_name}")
     
+    def is_idempotent(self, tool_name: str) -> bool:
+        """Whether the server serving a tool marks it idempotent"""
+        for client in self.clients.values():
+            tool = client.tools.get(tool_name)
+            if tool is not None:
+                return bool((tool.get("annotations") or {}).get("idempotentHint"))
+        return False
+    
     def get_all_tools(self) -> List[Dict[str, Any]]:
-        """Get all tools from all connected servers"""
+        """Get all tools from all connected servers (shared list; don't mutate)"""
+        if self._all_tools is not None:
+            return self._all_tools
         all_tools = []
         for client in self.clients.values():
             all_tools.extend(client.get_tools_for_llm())
+        self._all_tools = all_tools
         return all_tools
+    
+    async def aclose(self):
+        """Close every server connection the pool opened"""
+        for client in self.clients.values():
+            await client.aclose()
 
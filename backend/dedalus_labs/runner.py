@@ -6,6 +6,8 @@ import asyncio
 import logging
 from typing import Any, AsyncIterator, Dict, List, Optional, Union
 
+import httpx
+
 from .agent import Agent
 from .types import (
     AgentConfig,
@@ -16,6 +18,7 @@ from .types import (
     StreamEventType
 )
 from .mcp_client import MCPClientPool
+from .llm_client import aclose_llm_clients
 
 logger = logging.getLogger(__name__)
 
@@ -39,9 +42,10 @@ class DedalusRunner:
         )
     """
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.agents: Dict[str, Agent] = {}
-        self.mcp_pool = MCPClientPool()
+        self.http_client = http_client
+        self.mcp_pool = MCPClientPool(http_client=http_client)
         self._initialized = False
     
     def add_agent(self, config: AgentConfig) -> Agent:
@@ -52,9 +56,14 @@ class DedalusRunner:
             config: Agent configuration
             
         Returns:
-            The created Agent instance
+            The created Agent instance, or the existing one if this exact
+            config is already registered
         """
-        agent = Agent(config)
+        existing = self.agents.get(config.name)
+        if existing is not None and existing.config is config:
+            return existing
+        
+        agent = Agent(config, http_client=self.http_client, mcp_pool=self.mcp_pool)
         self.agents[config.name] = agent
         
         # Register handoffs between agents
@@ -69,16 +78,19 @@ class DedalusRunner:
         """Initialize MCP connections for all agents"""
         servers = mcp_servers or []
         
-        # Initialize shared MCP pool
-        for url in servers:
-            await self.mcp_pool.add_server(url)
+        # Initialize shared MCP pool, revalidating servers it already knows.
+        # Servers are independent, so their handshakes run concurrently
+        await asyncio.gather(*(self.mcp_pool.add_server(url) for url in servers))
         
-        # Initialize each agent's MCP connections
-        for agent in self.agents.values():
-            await agent.initialize_mcp(servers)
+        # Agents share the pool, so this only adds their config-specific servers
+        await asyncio.gather(*(agent.initialize_mcp(servers) for agent in self.agents.values()))
         
         self._initialized = True
     
+    async def aclose(self):
+        """Close the MCP connections shared by this runner's agents"""
+        await self.mcp_pool.aclose()
+    
     async def run(
         self,
         input_text: str,
@@ -220,19 +232,30 @@ class AsyncDedalus:
             response = await runner.run(...)
     """
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Args:
+            http_client: Keep-alive client shared by every runner's MCP
+                connections. The caller owns it and is responsible for closing it.
+        """
         self._runner: Optional[DedalusRunner] = None
+        self._runners: List[DedalusRunner] = []
+        self.http_client = http_client
     
     async def __aenter__(self) -> "AsyncDedalus":
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        # Cleanup if needed
-        pass
+        # Release pooled MCP and provider connections; they reopen on next use
+        for runner in self._runners:
+            await runner.aclose()
+        self._runners.clear()
+        await aclose_llm_clients()
     
     def create_runner(self) -> DedalusRunner:
         """Create a new DedalusRunner instance"""
-        self._runner = DedalusRunner()
+        self._runner = DedalusRunner(http_client=self.http_client)
+        self._runners.append(self._runner)
         return self._runner
 
 
@@ -0,0 +1,35 @@
+"""
+Incremental JSON parsing of streamed HTTP bodies
+"""
+
+from typing import Any, AsyncIterator, Tuple
+import ijson
+
+
+class ByteStreamReader:
+    """Async file-like view of a byte chunk iterator (e.g. httpx aiter_bytes), for ijson"""
+    
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+        # Part of the last chunk not yet handed to the parser
+        self._buffer = b""
+    
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to detect bytes vs str; it must not consume data
+        if size == 0:
+            return b""
+        while not self._buffer:
+            chunk = await anext(self._chunks, None)
+            if chunk is None:
+                return b""
+            self._buffer = chunk
+        if size < 0 or size >= len(self._buffer):
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def kvitems(chunks: AsyncIterator[bytes], prefix: str = "") -> AsyncIterator[Tuple[str, Any]]:
+    """Stream (key, value) pairs of the object at prefix; numbers are floats, not Decimal"""
+    return ijson.kvitems_async(ByteStreamReader(chunks), prefix, use_float=True)
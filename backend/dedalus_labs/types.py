@@ -3,7 +3,7 @@ Type definitions for Dedalus Labs
 """
 
 from typing import Any, Dict, List, Literal, Optional, Union
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 from datetime import datetime
 
@@ -83,7 +83,9 @@ class Message(BaseModel):
 
 
 class AgentConfig(BaseModel):
-    """Configuration for an agent"""
+    """Configuration for an agent (immutable, so one instance can be shared)"""
+    model_config = ConfigDict(frozen=True)
+    
     name: str
     model: str
     system_prompt: str
@@ -34,7 +34,8 @@ def _python_type_to_mcp(py_type: Any) -> str:
 
 def tool(
     name: Optional[str] = None,
-    description: Optional[str] = None
+    description: Optional[str] = None,
+    idempotent: bool = False
 ) -> Callable:
     """
     Decorator to register a function as an MCP tool.
@@ -48,6 +49,8 @@ def tool(
     Args:
         name: Override the tool name (defaults to function name)
         description: Override the description (defaults to docstring)
+        idempotent: Mark repeat calls with the same arguments as safe for
+                   clients to answer from a cache
     
     Returns:
         Decorated function with MCP tool metadata
@@ -89,7 +92,8 @@ def tool(
                 "type": "object",
                 "properties": properties,
                 "required": required
-            }
+            },
+            idempotent=idempotent
         )
         
         @functools.wraps(func)
@@ -165,7 +165,8 @@ class MCPServer:
             tools.append({
                 "name": schema.name,
                 "description": schema.description,
-                "inputSchema": schema.parameters
+                "inputSchema": schema.parameters,
+                "annotations": {"idempotentHint": schema.idempotent}
             })
         
         return {
@@ -188,17 +189,10 @@ class MCPServer:
             }
         
         try:
-            result = await self._execute_tool(tool_name, arguments)
             return {
                 "jsonrpc": "2.0",
                 "id": request.id,
-                "result": result.to_mcp_response() if isinstance(result, ToolResult) else result
-            }
-        except ToolError as e:
-            return {
-                "jsonrpc": "2.0",
-                "id": request.id,
-                "result": {"content": [{"type": "text", "text": e.message}], "isError": True}
+                "result": await self.call_tool(tool_name, arguments)
             }
         except Exception as e:
             return {
@@ -207,6 +201,20 @@ class MCPServer:
                 "error": {"code": -32603, "message": str(e)}
             }
     
+    async def call_tool(self, tool_name: str, arguments: dict) -> Dict[str, Any]:
+        """
+        Invoke a registered tool in-process.
+        
+        Returns the same result payload a tools/call request would, so
+        co-located callers can skip the HTTP round-trip.
+        """
+        try:
+            result = await self._execute_tool(tool_name, arguments)
+        except ToolError as e:
+            return {"content": [{"type": "text", "text": e.message}], "isError": True}
+        
+        return result.to_mcp_response() if isinstance(result, ToolResult) else result
+    
     async def _execute_tool(self, tool_name: str, arguments: dict) -> ToolResult:
         """Execute a registered tool"""
         tool_func = self.tools[tool_name]
@@ -225,7 +233,12 @@ class MCPServer:
             logger.exception(f"Tool execution failed: {tool_name}")
             raise ToolError(str(e))
     
-    def tool(self, name: Optional[str] = None, description: Optional[str] = None):
+    def tool(
+        self,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        idempotent: bool = False
+    ):
         """
         Decorator to register a tool with this server instance.
         
@@ -238,7 +251,7 @@ class MCPServer:
         
         def decorator(func: Callable) -> Callable:
             # Apply the tool decorator
-            wrapped = tool_decorator(name=name, description=description)(func)
+            wrapped = tool_decorator(name=name, description=description, idempotent=idempotent)(func)
             
             # Register with this server
             tool_name = wrapped._mcp_schema.name
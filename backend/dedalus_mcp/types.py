@@ -31,6 +31,7 @@ class ToolSchema(BaseModel):
     name: str
     description: str
     parameters: Dict[str, Any] = Field(default_factory=dict)
+    idempotent: bool = False  # Same arguments always give the same result
 
 
 class ToolResult(BaseModel):
@@ -108,7 +108,8 @@ SUPPLY_RATIOS = {
 
 @server.tool(
     name="calculate_supply_needs",
-    description="Calculate required relief supplies based on disaster type, affected population, and severity. Returns detailed JSON with food, water, medical kits, shelter, and specialized equipment needs."
+    description="Calculate required relief supplies based on disaster type, affected population, and severity. Returns detailed JSON with food, water, medical kits, shelter, and specialized equipment needs.",
+    idempotent=True
 )
 async def calculate_supply_needs(
     disaster_type: str,
@@ -229,7 +230,8 @@ async def calculate_supply_needs(
 
 @server.tool(
     name="prioritize_zones",
-    description="Analyze a list of affected zones and sort them by risk/urgency based on population density, infrastructure damage, accessibility, and vulnerability factors."
+    description="Analyze a list of affected zones and sort them by risk/urgency based on population density, infrastructure damage, accessibility, and vulnerability factors.",
+    idempotent=True
 )
 async def prioritize_zones(
     zones_list: List[Dict[str, Any]]
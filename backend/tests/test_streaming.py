@@ -0,0 +1,59 @@
+"""
+Regression tests for incremental JSON parsing of streamed bodies
+"""
+
+import asyncio
+
+from dedalus_labs.llm_client import AnthropicClient, _read_fields
+from dedalus_labs.streaming import kvitems
+
+
+async def _chunks(parts):
+    for part in parts:
+        yield part
+
+
+class _FakeResponse:
+    """Just enough of httpx.Response for _read_fields"""
+    
+    def __init__(self, parts):
+        self._parts = parts
+    
+    def aiter_bytes(self):
+        return _chunks(self._parts)
+
+
+BODY = b'{"id": "msg_1", "content": [{"type": "text", "text": "hi"}], "usage": {"input_tokens": 3}, "severity": 0.5}'
+
+
+def _collect(parts):
+    async def run():
+        return [item async for item in kvitems(_chunks(parts))]
+    return asyncio.run(run())
+
+
+def test_single_chunk_body():
+    items = dict(_collect([BODY]))
+    assert items["content"] == [{"type": "text", "text": "hi"}]
+    assert items["usage"] == {"input_tokens": 3}
+
+
+def test_multi_chunk_body():
+    # Split mid-token and mid-string, with an empty chunk in between
+    parts = [BODY[:7], b"", BODY[7:40], BODY[40:41], BODY[41:]]
+    assert dict(_collect(parts)) == dict(_collect([BODY]))
+
+
+def test_numbers_are_floats():
+    severity = dict(_collect([BODY]))["severity"]
+    assert type(severity) is float and severity == 0.5
+
+
+def test_anthropic_parse_from_chunks():
+    fields = asyncio.run(_read_fields(
+        _FakeResponse([BODY[:20], BODY[20:]]),
+        AnthropicClient._RESPONSE_KEYS
+    ))
+    assert set(fields) == {"content", "usage"}
+    parsed = AnthropicClient()._parse_response(fields)
+    assert parsed["content"] == "hi"